@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Batch simulator for auto-play paddle policies.
+Fans headless games out across a process pool. Board layouts are built once
+and shared with the workers through shared memory instead of being pickled
+with every task.
+
+Usage: python batch.py [--users 8] [--years 1] [--games 4] [--workers N] [--output stats.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from config import Config
+from contributions import ContributionCalendar, generate_mock_calendars
+from datetime import date
+from simulation import InputState, Simulation, board_layout
+from utils.blockstore import BlockStore
+
+BLOCK_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('count', '<u2')])
+
+# Precomputed inputs so policies don't allocate every tick
+HOLD = InputState()
+LEFT = InputState(left=True)
+RIGHT = InputState(right=True)
+LAUNCH = InputState(launch=True)
+
+# Games aim for a random spot on the paddle, up to this fraction of its width
+# off center, so each seed sends the ball off at different angles
+AIM_SPREAD = 0.2
+
+def follow_ball(simulation, aim=0.0):
+    """Keep the paddle under the ball, aim pixels right of its center."""
+    ball, paddle = simulation.ball, simulation.paddle
+    if ball.attached:
+        return LAUNCH
+    center = paddle.x + paddle.width / 2 + aim
+    if ball.x < center - 4:
+        return LEFT
+    if ball.x > center + 4:
+        return RIGHT
+    return HOLD
+
+def predict_landing(simulation, aim=0.0):
+    """
+    Move to where the falling ball will reach the paddle, bouncing off the side
+    walls, and meet it aim pixels right of the paddle's center.
+    """
+    ball, paddle = simulation.ball, simulation.paddle
+    if ball.attached:
+        return LAUNCH
+    target = ball.x
+    if ball.vy > 0:
+        # Unfold the side-wall bounces into a straight line, then fold it back
+        span = ball.world_width - 2 * ball.radius
+        x = ball.x - ball.radius + ball.vx * (paddle.y - ball.y) / ball.vy
+        x %= 2 * span
+        target = ball.radius + (x if x <= span else 2 * span - x)
+    center = paddle.x + paddle.width / 2 + aim
+    if target < center - paddle.width / 4:
+        return LEFT
+    if target > center + paddle.width / 4:
+        return RIGHT
+    return HOLD
+
+POLICIES = {
+    'follow_ball': follow_ball,
+    'predict_landing': predict_landing,
+}
+
+class SharedBoards:
+    """
+    Calendars and their board layouts in two shared memory segments.
+    Only the segment names and a small index are pickled to the workers.
+    """
+    def __init__(self, names, index):
+        self.names = names
+        self.index = index
+        self.segments = [shared_memory.SharedMemory(name=name) for name in names]
+        self.days = np.ndarray(index['days'], dtype='<u2', buffer=self.segments[0].buf)
+        self.blocks = np.ndarray(index['blocks'], dtype=BLOCK_DTYPE, buffer=self.segments[1].buf)
+    
+    @classmethod
+    def create(cls, calendars):
+        """Lay out every board of every calendar and copy them into shared memory."""
+        calendars_index = []
+        layouts = []
+        days = blocks = 0
+        for calendar in calendars:
+            weeks = len(calendar) // 7
+            boards = []
+            for board in range(max(1, -(-weeks // Config.WEEKS_PER_BOARD))):
+                layout = board_layout(calendar.counts, board)
+                boards.append((blocks, len(layout[2])))
+                layouts.append(layout)
+                blocks += len(layout[2])
+            calendars_index.append((calendar.start.toordinal(), days, len(calendar), boards))
+            days += len(calendar)
+        
+        # SharedMemory can't be empty
+        segments = [shared_memory.SharedMemory(create=True, size=max(1, days * 2)),
+                    shared_memory.SharedMemory(create=True, size=max(1, blocks * BLOCK_DTYPE.itemsize))]
+        index = {'days': days, 'blocks': blocks, 'calendars': calendars_index}
+        shared = cls([segment.name for segment in segments], index)
+        for segment in segments:
+            segment.close()
+        
+        for (_, offset, length, _), calendar in zip(calendars_index, calendars):
+            shared.days[offset:offset + length] = calendar.counts
+        offset = 0
+        for x, y, counts in layouts:
+            view = shared.blocks[offset:offset + len(counts)]
+            view['x'], view['y'], view['count'] = x, y, counts
+            offset += len(counts)
+        return shared
+    
+    def __getstate__(self):
+        return {'names': self.names, 'index': self.index}
+    
+    def __setstate__(self, state):
+        self.__init__(state['names'], state['index'])
+    
+    def __len__(self):
+        return len(self.index['calendars'])
+    
+    def calendar(self, i):
+        """Get calendar i as a view of shared memory."""
+        start, offset, length, _ = self.index['calendars'][i]
+        return ContributionCalendar(date.fromordinal(start), self.days[offset:offset + length])
+    
+    def layout(self, i, board):
+        """Get the x, y and count arrays of a board as views of shared memory."""
+        offset, length = self.index['calendars'][i][3][board]
+        blocks = self.blocks[offset:offset + length]
+        return blocks['x'], blocks['y'], blocks['count']
+    
+    def close(self):
+        """Detach from the shared memory."""
+        # Views must go before the buffers they point into can be released
+        self.days = self.blocks = None
+        for segment in self.segments:
+            segment.close()
+    
+    def unlink(self):
+        """Free the shared memory; call once, in the process that created it."""
+        for segment in self.segments:
+            segment.unlink()
+
+class SharedBoardSimulation(Simulation):
+    """A Simulation that reads its boards from SharedBoards instead of laying them out."""
+    def __init__(self, boards, calendar, seed=None):
+        self.shared_boards = boards
+        self.calendar_index = calendar
+        super().__init__(boards.calendar(calendar), seed)
+    
+    def _create_blocks(self):
+        return BlockStore(*self.shared_boards.layout(self.calendar_index, self.board))
+
+# Per-worker state, set up once by the pool initializer
+_boards = None
+
+def _init_worker(boards):
+    global _boards
+    _boards = boards
+
+def _play(task):
+    """Play the games of one task in a worker. Returns one stats row per game."""
+    calendar, name, seeds, max_ticks = task
+    policy = POLICIES[name]
+    rows = np.zeros((len(seeds), 5), dtype=np.int64)
+    for row, seed in zip(rows, seeds):
+        simulation = SharedBoardSimulation(_boards, calendar, seed)
+        rng = random.Random(seed)
+        aim = 0.0
+        for _ in range(max_ticks):
+            if simulation.game_over:
+                break
+            if simulation.ball.attached:
+                # A new aim for every serve
+                aim = rng.uniform(-AIM_SPREAD, AIM_SPREAD) * simulation.paddle.width
+            simulation.step(policy(simulation, aim))
+        cleared = simulation.game_over and simulation.lives > 0
+        row[:] = (simulation.score, simulation.lives, simulation.tick, cleared,
+                  simulation.board + (1 if cleared else 0))
+    return calendar, name, rows
+
+def summarize(rows):
+    """Aggregate per-game stats rows into score, lives and time-to-clear statistics."""
+    score, lives, ticks, cleared, boards = rows.T
+    cleared = cleared.astype(bool)
+    clear_times = ticks[cleared] / Config.PHYSICS_RATE
+    return {
+        'games': len(rows),
+        'score': {'mean': round(float(score.mean()), 2), 'std': round(float(score.std()), 2),
+                  'min': int(score.min()), 'max': int(score.max())},
+        'lives': {'mean': round(float(lives.mean()), 3), 'lost_all': int((lives == 0).sum())},
+        'boards_cleared': {'mean': round(float(boards.mean()), 3)},
+        'clear_rate': round(float(cleared.mean()), 3),
+        'time_to_clear_s': None if not len(clear_times) else {
+            'mean': round(float(clear_times.mean()), 2),
+            'p50': round(float(np.percentile(clear_times, 50)), 2),
+            'max': round(float(clear_times.max()), 2)},
+        'ticks': int(ticks.sum()),
+    }
+
+def simulate_batch(calendars, policies=None, games=1, seed=0, max_ticks=None, workers=None):
+    """
+    Play games for every calendar and policy on a process pool.
+    policies are names from POLICIES (default all). Each calendar/policy pair
+    plays `games` games with seeds derived from seed. Returns aggregated stats
+    per policy and per calendar/policy pair, plus throughput.
+    """
+    policies = list(policies or POLICIES)
+    max_ticks = max_ticks or Config.BATCH_MAX_TICKS
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.default_rng(seed).integers(0, 2 ** 32, size=(len(calendars), games)).tolist()
+    
+    # One task per calendar/policy pair and worker share, so work spreads evenly
+    per_task = max(1, -(-len(calendars) * len(policies) * games // (workers * 4)))
+    tasks = [(calendar, policy, seeds[calendar][i:i + per_task], max_ticks)
+             for calendar in range(len(calendars))
+             for policy in policies
+             for i in range(0, games, per_task)]
+    
+    boards = SharedBoards.create(calendars)
+    results = {}
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(boards,)) as pool:
+            for calendar, policy, rows in pool.map(_play, tasks):
+                results.setdefault((calendar, policy), []).append(rows)
+    finally:
+        boards.close()
+        boards.unlink()
+    elapsed = time.perf_counter() - start
+    
+    results = {key: np.concatenate(rows) for key, rows in results.items()}
+    ticks = sum(int(rows[:, 2].sum()) for rows in results.values())
+    return {
+        'workers': workers,
+        'games': len(calendars) * len(policies) * games,
+        'elapsed_s': round(elapsed, 3),
+        'ticks_per_second': round(ticks / elapsed),
+        'policies': {policy: summarize(np.concatenate([rows for (_, p), rows in results.items()
+                                                       if p == policy]))
+                     for policy in policies},
+        'calendars': [{policy: summarize(results[calendar, policy]) for policy in policies}
+                      for calendar in range(len(calendars))],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games with auto-play policies.")
+    parser.add_argument('--users', type=int, default=8, help="mock calendars to generate")
+    parser.add_argument('--years', type=int, default=1, help="length of each calendar, in years")
+    parser.add_argument('--games', type=int, default=4, help="games per calendar and policy")
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), help="policies to play")
+    parser.add_argument('--seed', type=int, default=0, help="seed for calendars and games")
+    parser.add_argument('--max-ticks', type=int, help="give up on a game after this many ticks")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    
+    calendars = generate_mock_calendars(args.users, args.years * 365, seed=args.seed)
+    results = simulate_batch(calendars, args.policies, args.games, args.seed,
+                             args.max_ticks, args.workers)
+    
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
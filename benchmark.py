@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Reproducible frame benchmark for GitHub Contribution Breakout.
+Plays scripted games on the SDL dummy video driver and prints JSON timings.
+
+Usage: python benchmark.py [--years 1 5 20] [--frames 1200] [--seed 0] [--balls 0]
+                            [--weeks-per-board 53] [--output results.json]
+"""
+
+import os
+
+# Must be set before pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import gc
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from config import Config
+from contributions import generate_mock_calendars
+from game import BreakoutGame
+from utils.effects import Effects
+
+FRAME_DT = 1.0 / Config.FPS
+
+class PhaseTimer:
+    """Wraps a function and records how long each call takes."""
+    def __init__(self, func):
+        self.func = func
+        self.samples = []
+    
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.func(*args, **kwargs)
+        self.samples.append(time.perf_counter() - start)
+        return result
+
+def percentiles(samples):
+    """Summarize timings in milliseconds."""
+    if not samples:
+        return None
+    ms = np.asarray(samples) * 1000
+    return {
+        'mean': round(float(ms.mean()), 4),
+        'p50': round(float(np.percentile(ms, 50)), 4),
+        'p90': round(float(np.percentile(ms, 90)), 4),
+        'p99': round(float(np.percentile(ms, 99)), 4),
+        'max': round(float(ms.max()), 4),
+    }
+
+def scripted_input(game):
+    """Steer the paddle under the ball and relaunch whenever it rests on the paddle."""
+    center = game.paddle.x + game.paddle.width / 2
+    held = (game.ball.x < center - 4, game.ball.x > center + 4)
+    events = []
+    if game.ball.attached:
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    return events, held
+
+def run_scenario(screen, years, frames, seed, balls=0, weeks_per_board=None):
+    """
+    Play one scripted game on a calendar of the given length and collect timings.
+    With balls, multiball is kept topped up to that many extra balls.
+    weeks_per_board overrides Config.WEEKS_PER_BOARD for the scenario; 0 puts
+    the whole calendar on one board.
+    """
+    calendar = generate_mock_calendars(1, years * 365, seed=seed)[0]
+    default_weeks = Config.WEEKS_PER_BOARD
+    if weeks_per_board is not None:
+        Config.WEEKS_PER_BOARD = weeks_per_board or -(-len(calendar) // 7)
+    try:
+        return _run_scenario(screen, years, frames, seed, balls, calendar)
+    finally:
+        Config.WEEKS_PER_BOARD = default_weeks
+
+def _run_scenario(screen, years, frames, seed, balls, calendar):
+    Effects.seed(seed)
+    Effects.pool.clear()
+    
+    start = time.perf_counter()
+    game = BreakoutGame(screen, calendar, seed=seed)
+    setup_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    game.sim._create_blocks()
+    create_blocks_time = time.perf_counter() - start
+    # As main.py does once loading finishes
+    gc.freeze()
+    
+    originals = Effects.__dict__['update'], Effects.__dict__['draw']
+    effects_update = PhaseTimer(Effects.update)
+    effects_draw = PhaseTimer(Effects.draw)
+    Effects.update, Effects.draw = effects_update, effects_draw
+    
+    update_times = []
+    draw_times = []
+    particles = []
+    chunks = []
+    try:
+        for _ in range(frames):
+            events, held = scripted_input(game)
+            swarm = game.sim.swarm
+            if swarm.count < balls and not game.ball.attached:
+                swarm.spawn(game.ball.x, game.ball.y, balls - swarm.count, game.sim.rng)
+            
+            start = time.perf_counter()
+            game.update(FRAME_DT, events, held)
+            update_times.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            game.draw()
+            draw_times.append(time.perf_counter() - start)
+            
+            particles.append(Effects.pool.count)
+            chunks.append(len(game.chunks))
+            if game.game_over:
+                break
+    finally:
+        # Restore the unwrapped classmethods
+        Effects.update, Effects.draw = originals
+        gc.unfreeze()
+    
+    allocations = measure_allocations(screen, calendar, seed, min(frames, 300))
+    
+    return {
+        'years': years,
+        'days': len(calendar),
+        'weeks_per_board': Config.WEEKS_PER_BOARD,
+        'world_width': game.sim.world_width,
+        'blocks': len(game.blocks),
+        'frames': len(update_times),
+        'balls': balls,
+        'final_score': game.score,
+        'boards_cleared': game.sim.board + (1 if game.game_over and game.lives > 0 else 0),
+        'setup_ms': round(setup_time * 1000, 4),
+        'create_blocks_ms': round(create_blocks_time * 1000, 4),
+        'update_ms': percentiles(update_times),
+        'draw_ms': percentiles(draw_times),
+        'effects_update_ms': percentiles(effects_update.samples),
+        'effects_draw_ms': percentiles(effects_draw.samples),
+        'particles': {'mean': round(float(np.mean(particles)), 2), 'max': int(np.max(particles))},
+        'chunks': {'mean': round(float(np.mean(chunks)), 2), 'max': int(np.max(chunks))},
+        'allocations': allocations,
+    }
+
+def measure_allocations(screen, calendar, seed, frames):
+    """Replay the start of the scenario under tracemalloc and report per-frame allocation."""
+    Effects.seed(seed)
+    Effects.pool.clear()
+    game = BreakoutGame(screen, calendar, seed=seed)
+    
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(frames):
+            events, held = scripted_input(game)
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            game.update(FRAME_DT, events, held)
+            game.draw()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'frames': frames,
+        'peak_bytes_per_frame': {'mean': int(np.mean(peaks)), 'max': int(np.max(peaks))},
+        'retained_bytes': retained,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's update and draw paths.")
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5, 20],
+                        help="calendar lengths to benchmark, in years")
+    parser.add_argument('--frames', type=int, default=1200, help="frames to play per scenario")
+    parser.add_argument('--seed', type=int, default=0, help="seed for calendars and effects")
+    parser.add_argument('--balls', type=int, default=0, help="extra multiball balls to keep in play")
+    parser.add_argument('--weeks-per-board', type=int,
+                        help="weeks per board instead of Config.WEEKS_PER_BOARD; "
+                             "0 plays each calendar as one wide board")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    
+    pygame.init()
+    screen = pygame.display.set_mode((Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT))
+    
+    results = {
+        'seed': args.seed,
+        'frame_dt': FRAME_DT,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'scenarios': [run_scenario(screen, years, args.frames, args.seed, args.balls, args.weeks_per_board)
+                      for years in args.years],
+    }
+    
+    pygame.quit()
+    
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
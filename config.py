@@ -2,11 +2,17 @@
 Configuration settings for GitHub Contribution Breakout
 """
 
+import os
+
 class Config:
     # Window settings
     WINDOW_WIDTH = 1200
     WINDOW_HEIGHT = 800
-    FPS = 60
+    FPS = 60                  # Render rate when the display's refresh rate is unknown
+    PHYSICS_RATE = 120        # Fixed simulation ticks per second
+    MAX_FRAME_TIME = 0.25     # Longest frame the simulation catches up on
+    FRAME_SPIN_TIME = 0.002   # Seconds before a frame's deadline spent polling instead of sleeping
+    INTERPOLATION_SNAP = 40   # Ball moves longer than this in one tick are drawn without interpolation
     
     # Game settings
     DARK_MODE = True
@@ -20,12 +26,73 @@ class Config:
     # Ball settings
     BALL_RADIUS = 8
     BALL_SPEED = 300
+    BALL_MAX_COLLISIONS = 8  # Collisions resolved per frame
+    BALL_TRAIL_LENGTH = 10
+    MULTIBALL_COUNT = 50     # Extra balls launched by the multiball key
+    MULTIBALL_CAPACITY = 1024
+    SWARM_TRAIL_SPRITES = 1500  # Trail circles drawn per frame; more balls get sparser trails
+    MAX_DIRTY_RECTS = 256    # Beyond this a layer reports one bounding rect
     
     # Block settings
     BLOCK_WIDTH = 12
     BLOCK_HEIGHT = 12
     BLOCK_SPACING = 3
     BLOCK_RADIUS = 2
+    BLOCK_ANIMATION_FRAMES = 12  # Pre-rendered destroy animation steps
+    # Weeks shown per board; longer histories span several boards. At 53 a board
+    # fits the window, so set WEEKS_PER_BOARD in the environment for wider,
+    # scrolling boards
+    WEEKS_PER_BOARD = int(os.getenv('WEEKS_PER_BOARD', 53))
+    WORLD_MARGIN = 40         # Space beside the blocks when a board is wider than the window
+    
+    # Camera settings
+    CAMERA_FOLLOW_SPEED = 4   # How quickly the view catches up with the ball
+    CHUNK_WIDTH = 400         # Width of pre-rendered background strips; a multiple of the grid
+    CHUNK_MARGIN = 400        # Strips this far off-screen stay loaded
+    
+    # Effect settings
+    MAX_PARTICLES = 2048
+    
+    # UI settings
+    TEXT_CACHE_SIZE = 64
+    
+    # GitHub settings
+    GITHUB_API_URL = 'https://api.github.com/graphql'  # GITHUB_API_URL in .env overrides
+    GITHUB_TIMEOUT = 10                                # Seconds per request
+    GITHUB_LOAD_TIMEOUT = 30                           # Seconds before startup stops waiting for the network
+    GITHUB_MAX_WORKERS = 8                             # Concurrent requests for batch fetches
+    GITHUB_USERS_PER_QUERY = 10                        # Users aliased into one GraphQL query
+    GITHUB_RETRIES = 3
+    GITHUB_RETRY_BACKOFF = 1.0                         # Seconds, doubled on each retry
+    GITHUB_RATE_LIMIT_RESERVE = 10                     # Requests kept in reserve before waiting for reset
+    CACHE_PATH = '~/.github_breakout/contributions.db'
+    CACHE_TTL = 3600                                   # Seconds before cached data is refreshed
+    
+    # Profiler settings
+    PROFILER_FRAMES = 240                  # Frames kept in the timing ring buffers
+    PROFILER_TRACE_EVENTS = 200000         # Phase events kept for trace export
+    PROFILER_TRACE_PATH = 'profile_trace.json'
+    
+    # Batch simulation settings
+    BATCH_MAX_TICKS = 120 * 60 * 10        # Give up on a game after ten minutes of play
+    
+    # Export settings
+    EXPORT_FPS = 30                        # Must divide PHYSICS_RATE
+    EXPORT_QUEUE_FRAMES = 8                # Frames buffered between a renderer and its encoder
+    EXPORT_MIN_SEGMENT = 60                # Fewest frames worth rendering in a separate process
+    EXPORT_PLAY_SECONDS = 120              # Auto-played game length searched for highlights
+    EXPORT_FRAME_FORMAT = 'tga'            # Frame files without ffmpeg; RLE TGA saves far faster than PNG
+    
+    # Leaderboard settings
+    LEADERBOARD_PATH = '~/.github_breakout/leaderboard.db'
+    LEADERBOARD_BATCH_SIZE = 512           # Games committed per transaction at most
+    LEADERBOARD_BATCH_DELAY = 0.05         # Seconds the writer waits to batch more games
+    
+    # Spectator settings
+    SPECTATOR_HOST = '127.0.0.1'
+    SPECTATOR_PORT = 8765
+    SPECTATOR_RATE = 30                    # Updates per second sent to spectators
+    SPECTATOR_BUFFER_LIMIT = 256 * 1024    # Bytes queued for a client before it is resynced
     
     # Sound settings
     SOUND_ENABLED = True
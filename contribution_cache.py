@@ -0,0 +1,111 @@
+"""
+Persistent on-disk cache for GitHub contribution data
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from config import Config
+from contributions import ContributionCalendar, to_date
+
+class ContributionCache:
+    def __init__(self, path=None, ttl=None):
+        self.path = os.path.expanduser(path or Config.CACHE_PATH)
+        self.ttl = Config.CACHE_TTL if ttl is None else ttl
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Shared between the main thread and background refreshes, guarded by lock
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS contributions (
+                    username TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (username, date)
+                ) WITHOUT ROWID
+            """)
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS fetches (
+                    username TEXT PRIMARY KEY,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+    
+    def load(self, username, start, end):
+        """
+        Get cached days between start and end (inclusive, 'YYYY-MM-DD') as a
+        ContributionCalendar, or None if nothing is cached.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT date, count FROM contributions "
+                "WHERE username = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (username, str(start), str(end))).fetchall()
+        if not rows:
+            return None
+        return ContributionCalendar.from_records([{'date': date, 'count': count}
+                                                  for date, count in rows])
+    
+    def date_range(self, username):
+        """Get the first and last cached dates for a user, or (None, None)."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT MIN(date), MAX(date) FROM contributions WHERE username = ?",
+                (username,)).fetchone()
+    
+    def gaps(self, username, start, end):
+        """
+        Get the uncached spans between cached days from start to end as
+        ('YYYY-MM-DD', 'YYYY-MM-DD') pairs. Days before the first or after the
+        last cached day don't count; date_range() tells those apart.
+        """
+        start, end = str(start), str(end)
+        with self.lock:
+            count, first, last = self.connection.execute(
+                "SELECT COUNT(*), MIN(date), MAX(date) FROM contributions "
+                "WHERE username = ? AND date BETWEEN ? AND ?", (username, start, end)).fetchone()
+            # Every fetched day is stored, zero counts included, so a full span has a row per day
+            if count == 0 or count == (to_date(last) - to_date(first)).days + 1:
+                return []
+            rows = self.connection.execute(
+                "SELECT date FROM contributions WHERE username = ? AND date BETWEEN ? AND ? "
+                "ORDER BY date", (username, start, end)).fetchall()
+        
+        gaps = []
+        previous = None
+        for (day,) in rows:
+            day = to_date(day)
+            if previous is not None and day - previous > timedelta(days=1):
+                gaps.append((str(previous + timedelta(days=1)), str(day - timedelta(days=1))))
+            previous = day
+        return gaps
+    
+    def is_fresh(self, username):
+        """Check whether the user's data was fetched within the TTL."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT fetched_at FROM fetches WHERE username = ?", (username,)).fetchone()
+        return row is not None and time.time() - row[0] < self.ttl
+    
+    def store(self, username, calendar):
+        """Save a fetched ContributionCalendar for a user and mark the data as fresh."""
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO contributions (username, date, count) VALUES (?, ?, ?)",
+                [(username, day, count)
+                 for day, count in zip(calendar.dates(), calendar.counts.tolist())])
+            self.connection.execute(
+                "INSERT OR REPLACE INTO fetches (username, fetched_at) VALUES (?, ?)",
+                (username, time.time()))
+    
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,131 @@
+"""
+Compact columnar storage for contribution calendars
+"""
+
+import struct
+from datetime import date, timedelta
+import numpy as np
+
+# File layout: magic, version, start day (proleptic ordinal), day count, padding,
+# then one little-endian uint16 count per day starting at HEADER_SIZE
+MAGIC = b'GHCB'
+VERSION = 1
+HEADER = struct.Struct('<4sHII')
+HEADER_SIZE = 16
+
+def to_date(value):
+    """Convert a 'YYYY-MM-DD' string or date to a date."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+class ContributionCalendar:
+    def __init__(self, start, counts):
+        self.start = to_date(start)
+        self.counts = np.asarray(counts, dtype=np.uint16)
+    
+    @classmethod
+    def from_records(cls, records):
+        """Build a calendar from a list of {'date', 'count'} dictionaries; gaps count as 0."""
+        if not records:
+            return cls(date.today(), [])
+        ordinals = np.fromiter((to_date(r['date']).toordinal() for r in records),
+                               dtype=np.int64, count=len(records))
+        values = np.fromiter((r['count'] for r in records), dtype=np.int64, count=len(records))
+        first = int(ordinals.min())
+        counts = np.zeros(int(ordinals.max()) - first + 1, dtype=np.uint16)
+        counts[ordinals - first] = np.minimum(values, np.iinfo(np.uint16).max)
+        return cls(date.fromordinal(first), counts)
+    
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a calendar saved with save(); memory-mapped read-only by default."""
+        with open(path, 'rb') as f:
+            magic, version, start, length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a contribution calendar file")
+            if not mmap:
+                f.seek(HEADER_SIZE)
+                return cls(date.fromordinal(start), np.fromfile(f, dtype='<u2', count=length))
+        if length == 0:
+            return cls(date.fromordinal(start), [])
+        counts = np.memmap(path, dtype='<u2', mode='r', offset=HEADER_SIZE, shape=(length,))
+        return cls(date.fromordinal(start), counts)
+    
+    def save(self, path):
+        """Write the calendar to a compact binary file that load() can memory-map."""
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.start.toordinal(), len(self.counts)).ljust(HEADER_SIZE, b'\0'))
+            f.write(self.counts.astype('<u2', copy=False).tobytes())
+    
+    @property
+    def end(self):
+        """Get the last day in the calendar."""
+        return self.start + timedelta(days=len(self.counts) - 1)
+    
+    def __len__(self):
+        return len(self.counts)
+    
+    def index(self, day):
+        """Get the offset of a day from the start of the calendar."""
+        return to_date(day).toordinal() - self.start.toordinal()
+    
+    def count(self, day):
+        """Get the contribution count for a day, 0 if outside the calendar."""
+        i = self.index(day)
+        if 0 <= i < len(self.counts):
+            return int(self.counts[i])
+        return 0
+    
+    def at(self, week, day):
+        """Get the count at a week column and day row, counted from the start."""
+        return int(self.counts[week * 7 + day])
+    
+    def slice(self, start=None, end=None):
+        """Get the days from start to end (inclusive) as a calendar sharing this one's memory."""
+        first = 0 if start is None else max(0, self.index(start))
+        last = len(self.counts) if end is None else min(len(self.counts), self.index(end) + 1)
+        last = max(first, last)
+        return ContributionCalendar(self.start + timedelta(days=first), self.counts[first:last])
+    
+    def dates(self):
+        """Get every day in the calendar as 'YYYY-MM-DD' strings, oldest first."""
+        return [(self.start + timedelta(days=i)).isoformat() for i in range(len(self.counts))]
+    
+    def to_records(self):
+        """Convert to the list of {'date', 'count'} dictionaries used by the GitHub API."""
+        return [{'date': day, 'count': int(count)}
+                for day, count in zip(self.dates(), self.counts.tolist())]
+
+# Mock data distribution: chance of any activity by weekday/weekend, counts for
+# active days, and the occasional heavy day
+MOCK_WEEKDAY_ACTIVITY = 0.7
+MOCK_WEEKEND_ACTIVITY = 0.3
+MOCK_COUNTS = np.arange(1, 10)
+MOCK_WEIGHTS = np.array([0.3, 0.25, 0.2, 0.1, 0.05, 0.04, 0.03, 0.02, 0.01])
+MOCK_HEAVY_CHANCE = 0.05
+MOCK_HEAVY_RANGE = (10, 20)
+
+def generate_mock_calendars(users, days, seed=None, end=None):
+    """
+    Generate realistic-looking calendars for many synthetic users in one batch.
+    Weekends are quieter, most active days have 1-5 contributions and a few
+    have 10-20. The same seed always gives the same calendars. Returns a list
+    of ContributionCalendar ending on end (default today) that share one
+    users x days count array.
+    """
+    rng = np.random.default_rng(seed)
+    end = to_date(end) if end is not None else date.today()
+    start = end - timedelta(days=days - 1)
+    shape = (users, days)
+    
+    weekday = (start.weekday() + np.arange(days)) % 7
+    activity = np.where(weekday >= 5, MOCK_WEEKEND_ACTIVITY, MOCK_WEEKDAY_ACTIVITY)
+    active = rng.random(shape) < activity
+    
+    counts = rng.choice(MOCK_COUNTS, size=shape, p=MOCK_WEIGHTS)
+    heavy = rng.random(shape) < MOCK_HEAVY_CHANCE
+    counts = np.where(heavy, rng.integers(MOCK_HEAVY_RANGE[0], MOCK_HEAVY_RANGE[1] + 1, shape), counts)
+    counts = np.where(active, counts, 0).astype(np.uint16)
+    
+    return [ContributionCalendar(start, row) for row in counts]
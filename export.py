@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Offscreen video export for replays and auto-played highlight clips.
+
+Frames are drawn by BreakoutGame on an offscreen surface under the SDL dummy
+driver, copied once into shared memory and handed through a bounded queue to an
+encoder process. Clips are split into segments rendered in parallel; the game
+is deterministic, so each segment fast-forwards headlessly to its first frame.
+With ffmpeg on the PATH clips are encoded to the output's format (.mp4, .gif,
+...); without it, or when the output has no extension, they are written as
+numbered image frames into a directory.
+
+Usage: python export.py game.replay -o game.mp4 [--start 0] [--seconds 20]
+       python export.py --users 100 --seconds 8 -o clips/ [--format gif] [--scale 0.5]
+"""
+
+import os
+
+# Must be set before pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import multiprocessing
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from config import Config
+from replay import Replay
+from simulation import IDLE_INPUT, InputState, Simulation
+
+# Frames are 32-bit pixels laid out R, G, B, unused in memory
+PIXEL_MASKS = (0xff, 0xff00, 0xff0000, 0)
+FFMPEG_PIXEL_FORMAT = 'rgb0'
+
+class FrameRing:
+    """
+    Frame slots in shared memory passed between a renderer and an encoder.
+    Slots go out through `filled` and come back through `free`, so at most
+    `slots` frames are ever queued: a slow encoder stalls rendering instead of
+    piling up frames.
+    """
+    def __init__(self, size, slots):
+        self.size = size
+        self.slots = slots
+        self.segment = shared_memory.SharedMemory(create=True, size=slots * size[0] * size[1] * 4)
+        self.free = multiprocessing.Queue()
+        self.filled = multiprocessing.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self.frames = self._view(self.segment)
+    
+    def _view(self, segment):
+        width, height = self.size
+        return np.ndarray((self.slots, height, width), dtype=np.uint32, buffer=segment.buf)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['segment'] = self.segment.name
+        del state['frames']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.segment = shared_memory.SharedMemory(name=state['segment'])
+        self.frames = self._view(self.segment)
+    
+    def put(self, surface, number):
+        """Copy a surface into the next free slot and queue it as frame `number`."""
+        slot = self.free.get()
+        # pixels2d is a view of the surface (x, y); transposed it matches the
+        # slot's row order, so this is the only copy a frame goes through
+        pixels = pygame.surfarray.pixels2d(surface)
+        np.copyto(self.frames[slot], pixels.T)
+        del pixels  # Unlocks the surface for the next frame's drawing
+        self.filled.put((slot, number))
+    
+    def close(self):
+        """Tell the encoder no more frames are coming."""
+        self.filled.put(None)
+    
+    def release(self):
+        """Detach from the shared memory; the creating side also frees it."""
+        self.frames = None
+        self.segment.close()
+    
+    def unlink(self):
+        self.segment.unlink()
+
+def _encode(ring, sink, fps):
+    """
+    Encoder process: drain frames from the ring into ffmpeg (sink is an output
+    file) or into numbered image files (sink is a directory).
+    """
+    width, height = ring.size
+    ffmpeg = None
+    if not os.path.isdir(sink):
+        ffmpeg = subprocess.Popen(
+            ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo',
+             '-pix_fmt', FFMPEG_PIXEL_FORMAT, '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+             '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', sink],
+            stdin=subprocess.PIPE)
+    try:
+        while True:
+            item = ring.filled.get()
+            if item is None:
+                break
+            slot, number = item
+            if ffmpeg is not None:
+                ffmpeg.stdin.write(ring.frames[slot].data)
+            else:
+                image = pygame.image.frombuffer(ring.frames[slot].data, ring.size, 'RGBX')
+                pygame.image.save(image, os.path.join(sink, f'frame_{number:06d}.{Config.EXPORT_FRAME_FORMAT}'))
+                del image
+            ring.free.put(slot)
+    finally:
+        if ffmpeg is not None:
+            ffmpeg.stdin.close()
+            ffmpeg.wait()
+        ring.release()
+
+# Per-worker offscreen surfaces, set up once by the pool initializer
+_screen = None
+_output = None
+
+def _init_worker(size):
+    global _screen, _output
+    pygame.display.init()
+    pygame.font.init()
+    # A tiny dummy window lets sprites convert to a display format
+    pygame.display.set_mode((1, 1))
+    _screen = pygame.Surface((Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT), 0, 32, PIXEL_MASKS)
+    _output = _screen if size == _screen.get_size() else pygame.Surface(size, 0, 32, PIXEL_MASKS)
+
+def _render(task):
+    """
+    Render frames [first, last) of a replay in a worker, fast-forwarding to the
+    first one without drawing. Returns the frames rendered and the seconds spent.
+    """
+    from game import BreakoutGame
+    from utils.effects import Effects
+    
+    replay, first, last, sink, number, fps = task
+    start = time.perf_counter()
+    Effects.seed(replay.seed)
+    Effects.pool.clear()
+    game = BreakoutGame(_screen, replay.calendar, seed=replay.seed)
+    
+    ticks = Config.PHYSICS_RATE // fps
+    decoded = [InputState.decode(bits) for bits in range(32)]
+    inputs = replay.inputs
+    loads = replay.loads_by_step()
+    ring = FrameRing(_output.get_size(), Config.EXPORT_QUEUE_FRAMES)
+    encoder = multiprocessing.Process(target=_encode, args=(ring, sink, fps))
+    encoder.start()
+    try:
+        for frame in range(last):
+            begin = frame * ticks
+            chunk = inputs[begin:begin + ticks]
+            frame_inputs = [decoded[bits] for bits in chunk] if chunk else [IDLE_INPUT] * ticks
+            # Calendars loaded mid-game go in between the ticks they were loaded at
+            for step in range(begin, begin + ticks):
+                if step in loads:
+                    game.advance(frame_inputs[:step - begin], 0)
+                    for calendar, complete in loads[step]:
+                        game.load(calendar, complete)
+                    frame_inputs = frame_inputs[step - begin:]
+                    begin = step
+            game.advance(frame_inputs, 1.0 / fps)
+            if frame < first:
+                continue
+            game.draw()
+            if _output is not _screen:
+                pygame.transform.smoothscale(_screen, _output.get_size(), _output)
+            ring.put(_output, number + frame - first)
+    finally:
+        ring.close()
+        encoder.join()
+        ring.release()
+        ring.unlink()
+    return last - first, time.perf_counter() - start
+
+def highlight(calendar, seed, seconds, fps, play_seconds=None, policy=None):
+    """
+    Auto-play a game headlessly and pick its best moment.
+    Returns the recorded Replay and the first frame of the `seconds`-long
+    window with the most points scored, plus the window's length in frames.
+    """
+    from batch import predict_landing
+    
+    policy = policy or predict_landing
+    play_seconds = play_seconds or Config.EXPORT_PLAY_SECONDS
+    simulation = Simulation(calendar, seed)
+    Replay.record(simulation)
+    ticks = Config.PHYSICS_RATE // fps
+    scores = []
+    for _ in range(int(play_seconds * fps)):
+        for _ in range(ticks):
+            simulation.step(policy(simulation))
+        scores.append(simulation.score)
+        if simulation.game_over:
+            break
+    
+    scores = np.asarray(scores)
+    frames = min(int(seconds * fps), len(scores))
+    # Points scored in the window starting at each frame
+    gains = scores[frames - 1:] - np.concatenate(([0], scores[:len(scores) - frames]))
+    return Replay.from_simulation(simulation), int(np.argmax(gains)), frames
+
+def export(clips, fps=None, scale=1.0, workers=None):
+    """
+    Render clips, each a (replay, first frame, frames, output path) tuple, on a
+    process pool. Clips with few enough of them to leave cores idle are split
+    into segments. Returns the frames rendered and the seconds taken.
+    """
+    fps = fps or Config.EXPORT_FPS
+    if Config.PHYSICS_RATE % fps:
+        raise ValueError(f"Export rate must divide the physics rate ({Config.PHYSICS_RATE} Hz)")
+    workers = workers or os.cpu_count() or 1
+    size = (int(Config.WINDOW_WIDTH * scale) // 2 * 2, int(Config.WINDOW_HEIGHT * scale) // 2 * 2)
+    ffmpeg = shutil.which('ffmpeg') is not None
+    
+    scratch = tempfile.mkdtemp(prefix='breakout-export-')
+    tasks = []
+    outputs = []
+    for index, (replay, first, frames, output) in enumerate(clips):
+        # Without ffmpeg, or for an output without extension, write image frames
+        encode = ffmpeg and os.path.splitext(output)[1] != ''
+        if not encode:
+            os.makedirs(output, exist_ok=True)
+        segments = max(1, min(-(-workers // len(clips)), frames // Config.EXPORT_MIN_SEGMENT))
+        bounds = np.linspace(first, first + frames, segments + 1).astype(int).tolist()
+        parts = []
+        for i, (start, end) in enumerate(zip(bounds, bounds[1:])):
+            part = os.path.join(scratch, f'{index}_{i}.mp4') if encode else output
+            parts.append(part)
+            tasks.append((replay, start, end, part, start - first, fps))
+        if encode:
+            outputs.append((parts, output))
+    
+    start = time.perf_counter()
+    rendered = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(size,)) as pool:
+            for frames, _ in pool.map(_render, tasks):
+                rendered += frames
+        for parts, output in outputs:
+            _join(parts, output, scratch)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return rendered, time.perf_counter() - start
+
+def _join(parts, output, scratch):
+    """Concatenate encoded segments into the final file, converting to GIF when asked."""
+    listing = os.path.join(scratch, 'parts.txt')
+    with open(listing, 'w') as f:
+        f.writelines(f"file '{part}'\n" for part in parts)
+    command = ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', listing]
+    if output.lower().endswith('.gif'):
+        command += ['-vf', 'split[a][b];[a]palettegen[p];[b][p]paletteuse']
+    else:
+        command += ['-c', 'copy']
+    subprocess.run(command + [output], check=True)
+
+def main():
+    from contributions import generate_mock_calendars
+    
+    parser = argparse.ArgumentParser(description="Render replays or highlight clips to video.")
+    parser.add_argument('replays', nargs='*', help="replay files written with RECORD=path")
+    parser.add_argument('-o', '--output', required=True,
+                        help="output file for one clip, or directory for several")
+    parser.add_argument('--users', type=int, help="auto-play this many mock users and export their highlights")
+    parser.add_argument('--years', type=int, default=1, help="length of mock calendars, in years")
+    parser.add_argument('--seed', type=int, default=0, help="seed for mock calendars and games")
+    parser.add_argument('--start', type=float, default=0, help="seconds into a replay to start")
+    parser.add_argument('--seconds', type=float, help="clip length (default: whole replay, or 10)")
+    parser.add_argument('--format', default='mp4', help="file type for clips written to a directory")
+    parser.add_argument('--fps', type=int, default=Config.EXPORT_FPS)
+    parser.add_argument('--scale', type=float, default=1.0, help="output size relative to the window")
+    parser.add_argument('--workers', type=int, help="render processes (default: CPU count)")
+    args = parser.parse_args()
+    
+    clips = []
+    many = len(args.replays) + (args.users or 0) > 1
+    extension = '' if shutil.which('ffmpeg') is None else f'.{args.format}'
+    for path in args.replays:
+        replay = Replay.load(path)
+        length = len(replay.inputs) * args.fps // replay.physics_rate
+        first = min(int(args.start * args.fps), length)
+        frames = length - first if args.seconds is None else min(int(args.seconds * args.fps), length - first)
+        name = os.path.splitext(os.path.basename(path))[0]
+        clips.append((replay, first, frames,
+                      os.path.join(args.output, name + extension) if many else args.output))
+    if args.users:
+        calendars = generate_mock_calendars(args.users, args.years * 365, seed=args.seed)
+        seeds = np.random.default_rng(args.seed).integers(0, 2 ** 32, size=args.users).tolist()
+        for user, (calendar, seed) in enumerate(zip(calendars, seeds)):
+            replay, first, frames = highlight(calendar, seed, args.seconds or 10, args.fps)
+            clips.append((replay, first, frames,
+                          os.path.join(args.output, f'user{user:04d}{extension}') if many else args.output))
+    if not clips:
+        parser.error("give replay files or --users")
+    if many:
+        os.makedirs(args.output, exist_ok=True)
+    
+    frames, elapsed = export(clips, args.fps, args.scale, args.workers)
+    video_time = frames / args.fps
+    print(f"Exported {len(clips)} clips, {frames} frames ({video_time:.1f}s of video) in {elapsed:.1f}s "
+          f"({video_time / max(elapsed, 1e-9):.1f}x real time)")
+
+if __name__ == "__main__":
+    main()
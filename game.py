@@ -2,311 +2,348 @@
 Main game logic for GitHub Contribution Breakout
 """
 
+import time
 import pygame
-import math
+import numpy as np
+import simulation
+from datetime import date
 from config import Config
+from contributions import ContributionCalendar
+from simulation import InputState, Simulation
+from utils.camera import Camera
 from utils.colors import Colors
 from utils.effects import Effects
+from utils.profiler import Profiler
+from utils.text import TextCache
 
-class Paddle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = Config.PADDLE_WIDTH
-        self.height = Config.PADDLE_HEIGHT
-        self.speed = Config.PADDLE_SPEED
-        self.color = Colors.PADDLE
-        
-    def update(self, dt, keys):
-        """Update paddle position based on input."""
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.x = max(0, self.x - self.speed * dt)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.x = min(Config.WINDOW_WIDTH - self.width, self.x + self.speed * dt)
+class Paddle(simulation.Paddle):
+    highlight = None
     
-    def draw(self, screen):
-        """Draw paddle with rounded corners."""
-        pygame.draw.rect(screen, self.color, 
-                        (self.x, self.y, self.width, self.height),
+    def draw(self, screen, offset=0, x=None):
+        """
+        Draw paddle with rounded corners at x (default its position), offset
+        world x to the left. Returns the area drawn.
+        """
+        x = (self.x if x is None else x) - offset
+        rect = pygame.draw.rect(screen, self.color, 
+                        (x, self.y, self.width, self.height),
                         border_radius=Config.PADDLE_RADIUS)
         # Add subtle highlight
-        highlight = pygame.Surface((self.width - 4, 2))
-        highlight.set_alpha(100)
-        highlight.fill((255, 255, 255))
-        screen.blit(highlight, (self.x + 2, self.y + 2))
+        if Paddle.highlight is None or Paddle.highlight.get_width() != self.width - 4:
+            Paddle.highlight = pygame.Surface((self.width - 4, 2))
+            Paddle.highlight.set_alpha(100)
+            Paddle.highlight.fill((255, 255, 255))
+        screen.blit(Paddle.highlight, (x + 2, self.y + 2))
+        return rect
 
-class Ball:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = Config.BALL_RADIUS
-        self.vx = Config.BALL_SPEED
-        self.vy = -Config.BALL_SPEED
-        self.color = Colors.BALL
-        self.attached = True
-        self.trail = []
-        
-    def update(self, dt, paddle):
-        """Update ball position and handle collisions."""
-        if self.attached:
-            self.x = paddle.x + paddle.width // 2
-            self.y = paddle.y - self.radius - 1
-            return
-        
-        # Update trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > 10:
-            self.trail.pop(0)
-        
-        # Move ball
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        
-        # Wall collisions
-        if self.x <= self.radius or self.x >= Config.WINDOW_WIDTH - self.radius:
-            self.vx = -self.vx
-            Effects.create_spark(self.x, self.y)
-            
-        if self.y <= self.radius:
-            self.vy = -self.vy
-            Effects.create_spark(self.x, self.y)
-            
-        # Paddle collision
-        if (self.y + self.radius >= paddle.y and 
-            self.y - self.radius <= paddle.y + paddle.height and
-            self.x >= paddle.x and 
-            self.x <= paddle.x + paddle.width):
-            
-            # Calculate bounce angle based on hit position
-            hit_pos = (self.x - paddle.x) / paddle.width
-            angle = math.pi * (0.125 + 0.75 * hit_pos)
-            
-            speed = math.sqrt(self.vx**2 + self.vy**2)
-            self.vx = speed * math.cos(angle)
-            self.vy = -abs(speed * math.sin(angle))
-            
-            Effects.create_spark(self.x, self.y)
-    
-    def launch(self):
-        """Launch ball from paddle."""
-        self.attached = False
-        
-    def draw(self, screen):
-        """Draw ball with glow effect."""
+class Ball(simulation.Ball):
+    def draw(self, screen, offset=0, pos=None):
+        """
+        Draw ball with glow effect at pos (default its position), offset world
+        x to the left. Returns the area drawn.
+        """
         # Draw trail
-        for i, pos in enumerate(self.trail):
+        rects = []
+        for i, point in enumerate(self.trail):
             alpha = int(255 * (i / len(self.trail)) * 0.3)
             color = (*self.color, alpha)
-            pygame.draw.circle(screen, color[:3], (int(pos[0]), int(pos[1])), 
-                             self.radius * (i / len(self.trail)))
+            rects.append(pygame.draw.circle(screen, color[:3], (int(point[0] - offset), int(point[1])), 
+                             self.radius * (i / len(self.trail))))
         
         # Draw ball
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+        x, y = (self.x, self.y) if pos is None else pos
+        x -= offset
+        rect = pygame.draw.circle(screen, self.color, (int(x), int(y)), self.radius)
         
         # Add highlight
-        highlight_pos = (int(self.x - self.radius * 0.3), int(self.y - self.radius * 0.3))
+        highlight_pos = (int(x - self.radius * 0.3), int(y - self.radius * 0.3))
         pygame.draw.circle(screen, (255, 255, 255), highlight_pos, self.radius // 3)
+        return rect.unionall(rects)
 
-class Block:
-    def __init__(self, x, y, contribution_count):
-        self.x = x
-        self.y = y
-        self.width = Config.BLOCK_WIDTH
-        self.height = Config.BLOCK_HEIGHT
-        self.contribution_count = contribution_count
-        self.color = self._get_color(contribution_count)
-        self.destroyed = False
-        self.destroy_animation = 0
-        
-    def _get_color(self, count):
-        """Get color based on contribution count."""
-        if count == 0:
-            return Colors.CONTRIB_NONE
-        elif count <= 3:
-            return Colors.CONTRIB_LOW
-        elif count <= 6:
-            return Colors.CONTRIB_MEDIUM
-        elif count <= 9:
-            return Colors.CONTRIB_HIGH
-        else:
-            return Colors.CONTRIB_MAX
+class BallSwarm(simulation.BallSwarm):
+    sprites = None
+    sprites_version = None
     
-    def hit(self):
-        """Handle block being hit."""
-        if not self.destroyed:
-            self.destroyed = True
-            self.destroy_animation = 1.0
-            Effects.create_explosion(self.x + self.width // 2, 
-                                   self.y + self.height // 2, 
-                                   self.color)
-            return True
-        return False
+    def _build_sprites(self):
+        """Pre-render the trail circles, smallest first, and the ball itself."""
+        r = self.radius
+        sprites = []
+        for i in range(Config.BALL_TRAIL_LENGTH + 1):
+            # Color-keyed rather than per-pixel alpha: far cheaper to blit in bulk
+            sprite = pygame.Surface((r * 2, r * 2))
+            sprite.fill((255, 0, 255))
+            sprite.set_colorkey((255, 0, 255), pygame.RLEACCEL)
+            pygame.draw.circle(sprite, self.color, (r, r), r * (i / Config.BALL_TRAIL_LENGTH))
+            sprites.append(sprite)
+        pygame.draw.circle(sprites[-1], (255, 255, 255), (int(r * 0.7), int(r * 0.7)), r // 3)
+        BallSwarm.sprites = sprites
+        BallSwarm.sprites_version = Colors.theme_version
     
-    def update(self, dt):
-        """Update block animation."""
-        if self.destroyed and self.destroy_animation > 0:
-            self.destroy_animation -= dt * 3
-    
-    def draw(self, screen):
-        """Draw block with effects."""
-        if self.destroyed and self.destroy_animation <= 0:
-            return
-            
-        if self.destroyed:
-            # Destruction animation
-            scale = self.destroy_animation
-            w = int(self.width * scale)
-            h = int(self.height * scale)
-            x = self.x + (self.width - w) // 2
-            y = self.y + (self.height - h) // 2
-            
-            alpha = int(255 * self.destroy_animation)
-            color = (*self.color, alpha)
-            
-            pygame.draw.rect(screen, color[:3], (x, y, w, h), 
-                           border_radius=Config.BLOCK_RADIUS)
-        else:
-            # Normal draw
-            pygame.draw.rect(screen, self.color, 
-                           (self.x, self.y, self.width, self.height),
-                           border_radius=Config.BLOCK_RADIUS)
-            
-            # Add subtle gradient effect
-            if self.contribution_count > 0:
-                highlight = pygame.Surface((self.width - 2, self.height // 2))
-                highlight.set_alpha(30)
-                highlight.fill((255, 255, 255))
-                screen.blit(highlight, (self.x + 1, self.y + 1))
+    def draw(self, screen, offset=0):
+        """
+        Draw the balls on screen and their trails in one blits call, offset
+        world x to the left. Returns the areas drawn.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        if BallSwarm.sprites_version != Colors.theme_version:
+            self.color = Colors.BALL
+            self._build_sprites()
+        
+        # Skip balls off-screen (trails are short enough to go with their ball)
+        margin = self.radius * Config.BALL_TRAIL_LENGTH
+        x = self.pos[:n, 0]
+        shown = np.flatnonzero((x > offset - margin) & (x < offset + screen.get_width() + margin))
+        if len(shown) == 0:
+            return []
+        shift = np.array([offset + self.radius, self.radius])
+        
+        # Oldest trail positions first, so newer ones and the balls land on top.
+        # With many balls only every stride-th position is drawn, newest kept,
+        # so the blit count stays near Config.SWARM_TRAIL_SPRITES
+        length = len(self.trail)
+        size = self.trail_size
+        stride = max(1, -(-len(shown) * size // Config.SWARM_TRAIL_SPRITES))
+        ages = range((size - 1) % stride, size, stride)
+        slots = [(self.trail_head - size + i) % length for i in ages]
+        first = length - size
+        corners = (self.trail[slots][:, shown] - shift).astype(np.int32).tolist()
+        sequence = [(self.sprites[first + i], corner)
+                    for i, row in zip(ages, corners) for corner in row]
+        sequence.extend((self.sprites[-1], corner)
+                        for corner in (self.pos[shown] - shift).astype(np.int32).tolist())
+        rects = screen.blits(sequence)
+        
+        # Hundreds of small rects cost more to restore and present than their bounds
+        if len(rects) > Config.MAX_DIRTY_RECTS:
+            return [rects[0].unionall(rects)]
+        return rects
+
+class GameSimulation(Simulation):
+    paddle_class = Paddle
+    ball_class = Ball
+    swarm_class = BallSwarm
 
 class BreakoutGame:
-    def __init__(self, screen, contributions):
+    def __init__(self, screen, contributions=None, seed=None):
+        """Without contributions the game shows a loading screen until load() is called."""
         self.screen = screen
         self.contributions = contributions
         self.dark_mode = Config.DARK_MODE
-        
-        # Game objects
-        self.paddle = Paddle(Config.WINDOW_WIDTH // 2 - Config.PADDLE_WIDTH // 2,
-                           Config.WINDOW_HEIGHT - 100)
-        self.ball = Ball(self.paddle.x + self.paddle.width // 2,
-                        self.paddle.y - Config.BALL_RADIUS)
-        self.blocks = self._create_blocks()
-        
-        # Game state
-        self.score = 0
-        self.lives = 3
-        self.game_over = False
-        self.paused = False
+        self.loading = contributions is None
+        self.created = time.perf_counter()
+        
+        # Simulation runs at a fixed rate; frames carry over leftover time and
+        # draw the paddle and ball that far between the last two ticks
+        if contributions is None:
+            contributions = ContributionCalendar(date.today(), [])
+        self.sim = GameSimulation(contributions, seed)
+        self.accumulator = 0.0
+        self.previous = None
+        self.alpha = 1.0
+        
+        # Rendering: cached static layers and last frame's dirty areas. The
+        # background is composed from world-space strips (chunks) around the view
+        self.camera = Camera(*screen.get_size())
+        self.chunks = {}
+        self.view_offset = None
+        self.backdrop = None
+        self.background = None
+        self.background_dark_mode = None
+        self.background_blocks = None
+        self.drawn_alive = None
+        self.dirty_rects = []
+        self.full_redraw = True
         
         # UI
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
-        
-    def _create_blocks(self):
-        """Create blocks from GitHub contributions."""
-        blocks = []
-        
-        # Calculate grid dimensions
-        days_in_week = 7
-        weeks = len(self.contributions) // days_in_week
-        
-        # Starting position
-        start_x = (Config.WINDOW_WIDTH - (weeks * (Config.BLOCK_WIDTH + Config.BLOCK_SPACING))) // 2
-        start_y = 100
-        
-        for week in range(weeks):
-            for day in range(days_in_week):
-                idx = week * days_in_week + day
-                if idx < len(self.contributions):
-                    contribution = self.contributions[idx]
-                    
-                    x = start_x + week * (Config.BLOCK_WIDTH + Config.BLOCK_SPACING)
-                    y = start_y + day * (Config.BLOCK_HEIGHT + Config.BLOCK_SPACING)
-                    
-                    # Only create blocks for days with contributions
-                    if contribution['count'] > 0:
-                        blocks.append(Block(x, y, contribution['count']))
-        
-        return blocks
+        self.text_cache = TextCache(Config.TEXT_CACHE_SIZE)
+        self.overlays = {}
+        self.overlay_drawn = None
+    
+    def load(self, contributions, complete=True):
+        """
+        Take in contributions as they arrive; complete=False means more will follow.
+        Blocks appear on the board in play until its first block is hit.
+        """
+        self.contributions = contributions
+        self.sim.load_contributions(contributions, complete)
+        self.loading = False
+    
+    def prewarm(self):
+        """Render the block atlas, ball and particle sprites and HUD text before they are needed."""
+        Colors.block_atlas()
+        self.sim.swarm._build_sprites()
+        Effects.prewarm([(255, 255, 255), *Colors.contribution_palette()])
+        for text in (f"Score: {self.score}", f"Lives: {self.lives}"):
+            self._render_text(self.font, text, Colors.TEXT)
+        self._render_text(self.small_font, "Press SPACE to launch", Colors.TEXT_SECONDARY)
+        
+        # Rasterize every digit once so score changes render from the glyph cache
+        self.font.render("0123456789", True, Colors.TEXT)
+    
+    @property
+    def paddle(self):
+        return self.sim.paddle
+    
+    @property
+    def ball(self):
+        return self.sim.ball
+    
+    @property
+    def blocks(self):
+        return self.sim.blocks
+    
+    @property
+    def score(self):
+        return self.sim.score
     
-    def update(self, dt, events):
-        """Update game state."""
-        # Handle events
+    @property
+    def lives(self):
+        return self.sim.lives
+    
+    @property
+    def game_over(self):
+        return self.sim.game_over
+    
+    @property
+    def paused(self):
+        return self.sim.paused
+    
+    def update(self, dt, events, held=None):
+        """
+        Update game state.
+        held optionally replaces the keyboard with a (left, right) pair for scripted input.
+        """
+        launch = pause = multiball = False
         for event in events:
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and self.ball.attached:
-                    self.ball.launch()
+                if event.key == pygame.K_SPACE:
+                    launch = True
+                elif event.key == pygame.K_m:
+                    multiball = True
                 elif event.key == pygame.K_p:
-                    self.paused = not self.paused
+                    pause = not pause
                 elif event.key == pygame.K_t:
                     self.dark_mode = not self.dark_mode
                     Colors.update_theme(self.dark_mode)
         
+        if self.loading:
+            return
+        
+        if held is None:
+            keys = pygame.key.get_pressed()
+            held = (keys[pygame.K_LEFT] or keys[pygame.K_a],
+                    keys[pygame.K_RIGHT] or keys[pygame.K_d])
+        inputs = InputState(left=held[0], right=held[1], launch=launch, pause=pause,
+                            multiball=multiball)
+        
+        # Run as many fixed ticks as this frame covers; edge-triggered inputs
+        # take effect this frame even when no tick is due yet
+        self.accumulator = min(self.accumulator + dt, Config.MAX_FRAME_TIME)
+        if launch or pause or multiball:
+            self.accumulator = max(self.accumulator, self.sim.dt)
+        with Profiler.phase('physics'):
+            while self.accumulator >= self.sim.dt:
+                self.previous = (self.paddle.x, self.ball.x, self.ball.y)
+                self._step(inputs)
+                inputs.launch = inputs.pause = inputs.multiball = False
+                self.accumulator -= self.sim.dt
+                if self.paused or self.game_over:
+                    self.accumulator = 0.0
+                    break
+        
+        self.alpha = self.accumulator / self.sim.dt
         if self.paused or self.game_over:
             return
         
-        # Get keys
-        keys = pygame.key.get_pressed()
-        
-        # Update game objects
-        self.paddle.update(dt, keys)
-        self.ball.update(dt, self.paddle)
-        
-        # Update blocks
-        for block in self.blocks:
-            block.update(dt)
-        
-        # Check ball-block collisions
-        for block in self.blocks:
-            if not block.destroyed:
-                if (self.ball.x + self.ball.radius >= block.x and
-                    self.ball.x - self.ball.radius <= block.x + block.width and
-                    self.ball.y + self.ball.radius >= block.y and
-                    self.ball.y - self.ball.radius <= block.y + block.height):
-                    
-                    if block.hit():
-                        self.score += block.contribution_count * 10
-                        self.ball.vy = -self.ball.vy
-        
-        # Check if ball is out of bounds
-        if self.ball.y > Config.WINDOW_HEIGHT:
-            self.lives -= 1
-            if self.lives <= 0:
-                self.game_over = True
-            else:
-                # Reset ball
-                self.ball = Ball(self.paddle.x + self.paddle.width // 2,
-                               self.paddle.y - Config.BALL_RADIUS)
-        
-        # Check win condition
-        if all(block.destroyed for block in self.blocks if block.contribution_count > 0):
-            self.game_over = True
-        
-        # Update effects
-        Effects.update(dt)
+        self.camera.follow(self._interpolated()[1], self.sim.world_width, dt)
+    
+    def advance(self, inputs, dt):
+        """
+        Run one frame of recorded per-tick inputs instead of reading the keyboard,
+        then move the camera as a frame of dt would. Used to render replays.
+        """
+        for tick_inputs in inputs:
+            self.previous = (self.paddle.x, self.ball.x, self.ball.y)
+            self._step(tick_inputs)
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        if not (self.paused or self.game_over):
+            self.camera.follow(self.ball.x, self.sim.world_width, dt)
+    
+    def _step(self, inputs):
+        """Run one simulation tick and play its effects."""
+        self.sim.step(inputs)
+        Effects.update(self.sim.dt)
+        for event in self.sim.events:
+            if event[0] == 'spark':
+                Effects.create_spark(event[1], event[2])
+            elif event[0] == 'explosion':
+                Effects.create_explosion(event[1], event[2], event[3])
     
     def draw(self):
-        """Draw everything."""
-        # Clear screen
-        self.screen.fill(Colors.BACKGROUND)
+        """
+        Draw everything.
+        Returns the list of changed screen areas for pygame.display.update,
+        or None when the whole screen changed.
+        """
+        if self.loading:
+            return self._draw_loading()
+        
+        overlay = self.paused or self.game_over
+        if overlay:
+            # Paused and finished scenes are static until the theme changes
+            state = (self.paused, self.game_over, Colors.theme_version)
+            if state == self.overlay_drawn:
+                return []
+            self.overlay_drawn = state
+        else:
+            self.overlay_drawn = None
         
-        # Draw grid pattern (subtle)
-        for x in range(0, Config.WINDOW_WIDTH, 50):
-            pygame.draw.line(self.screen, Colors.GRID_LINE, (x, 0), (x, Config.WINDOW_HEIGHT))
-        for y in range(0, Config.WINDOW_HEIGHT, 50):
-            pygame.draw.line(self.screen, Colors.GRID_LINE, (0, y), (Config.WINDOW_WIDTH, y))
+        if (self.background is None or self.background_dark_mode != self.dark_mode or
+                self.background_blocks is not self.blocks):
+            self._build_background()
+        with Profiler.phase('blocks'):
+            self._patch_background()
+            
+            # Scrolling re-composes the view from chunks and redraws everything
+            offset = self.camera.offset
+            if offset != self.view_offset:
+                self._compose_view(offset)
+        
+        # Restore what was drawn over last frame
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                self.screen.blit(self.background, rect, rect)
         
         # Draw game objects
-        for block in self.blocks:
-            block.draw(self.screen)
-        
-        self.paddle.draw(self.screen)
-        self.ball.draw(self.screen)
+        with Profiler.phase('blocks'):
+            rects = self._draw_animating_blocks()
+        paddle_x, ball_x, ball_y = self._interpolated()
+        rects.append(self.paddle.draw(self.screen, offset, paddle_x))
+        rects.append(self.ball.draw(self.screen, offset, (ball_x, ball_y)))
+        rects.extend(self.sim.swarm.draw(self.screen, offset))
         
         # Draw effects
-        Effects.draw(self.screen)
+        with Profiler.phase('effects'):
+            rects.extend(Effects.draw(self.screen, offset, self.alpha))
         
         # Draw UI
-        self._draw_ui()
+        with Profiler.phase('hud'):
+            rects.extend(self._draw_ui())
+            if Profiler.enabled:
+                rects.append(Profiler.draw_overlay(self.screen, self.small_font, {
+                    'particles': Effects.pool.count,
+                    'balls': 1 + self.sim.swarm.count,
+                    'blocks': self.blocks.alive_count,
+                    'animating': len(self.blocks.animating),
+                    'chunks': len(self.chunks),
+                }))
         
         # Draw pause overlay
         if self.paused:
@@ -315,44 +352,193 @@ class BreakoutGame:
         # Draw game over
         if self.game_over:
             self._draw_game_over()
+        
+        if overlay or self.full_redraw:
+            self.full_redraw = False
+            self.dirty_rects = [self.screen.get_rect()] if overlay else rects
+            return None
+        
+        dirty = self.dirty_rects + rects
+        self.dirty_rects = rects
+        return dirty
+    
+    def _interpolated(self):
+        """Get the paddle x and ball position alpha of the way from the previous tick to the last."""
+        current = (self.paddle.x, self.ball.x, self.ball.y)
+        previous = self.previous
+        # Resets and new boards teleport; draw those where they landed
+        if (previous is None or
+                abs(current[1] - previous[1]) + abs(current[2] - previous[2]) > Config.INTERPOLATION_SNAP):
+            return current
+        return tuple(p + (c - p) * self.alpha for p, c in zip(previous, current))
+    
+    def _build_background(self):
+        """Start a fresh set of background chunks for the current theme and board."""
+        # One grid tile serves every chunk, since chunks start on grid lines
+        self.backdrop = pygame.Surface((Config.CHUNK_WIDTH, Config.WINDOW_HEIGHT), 0, self.screen)
+        self.backdrop.fill(Colors.BACKGROUND)
+        
+        # Draw grid pattern (subtle)
+        for x in range(0, Config.CHUNK_WIDTH, 50):
+            pygame.draw.line(self.backdrop, Colors.GRID_LINE, (x, 0), (x, Config.WINDOW_HEIGHT))
+        for y in range(0, Config.WINDOW_HEIGHT, 50):
+            pygame.draw.line(self.backdrop, Colors.GRID_LINE, (0, y), (Config.CHUNK_WIDTH, y))
+        
+        self.background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        self.chunks = {}
+        self.view_offset = None
+        self.background_dark_mode = self.dark_mode
+        self.background_blocks = self.blocks
+        self.drawn_alive = self.blocks.alive.copy()
+    
+    def _render_chunk(self, index):
+        """Pre-render the grid and intact blocks of one world-space strip."""
+        chunk = self.backdrop.copy()
+        left = index * Config.CHUNK_WIDTH
+        blocks = self.blocks
+        alive = blocks.query(left - blocks.width, 0, left + Config.CHUNK_WIDTH, Config.WINDOW_HEIGHT)
+        atlas = Colors.block_atlas()
+        chunk.blits([(atlas.surface, (x - left, y), atlas.block(level))
+                     for x, y, level in zip(blocks.x[alive].astype(int).tolist(),
+                                            blocks.y[alive].astype(int).tolist(),
+                                            blocks.levels[alive].tolist())],
+                    doreturn=False)
+        return chunk
+    
+    def _compose_view(self, offset):
+        """Assemble the background for a camera offset, paging chunks in and out."""
+        width = Config.CHUNK_WIDTH
+        first = offset // width
+        last = (offset + self.screen.get_width() - 1) // width
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index)
+            if chunk is None:
+                chunk = self.chunks[index] = self._render_chunk(index)
+            self.background.blit(chunk, (index * width - offset, 0))
+        
+        # Drop chunks that scrolled well out of view
+        low, high = self.camera.visible(Config.CHUNK_MARGIN)
+        self.chunks = {index: chunk for index, chunk in self.chunks.items()
+                       if (index + 1) * width > low and index * width < high}
+        self.view_offset = offset
+        self.full_redraw = True
+    
+    def _patch_background(self):
+        """Erase newly destroyed blocks from the loaded chunks and the view."""
+        blocks = self.blocks
+        width = Config.CHUNK_WIDTH
+        for i in np.flatnonzero(self.drawn_alive & ~blocks.alive):
+            rect = pygame.Rect(int(blocks.x[i]), int(blocks.y[i]), blocks.width, blocks.height)
+            for index in range(rect.left // width, (rect.right - 1) // width + 1):
+                chunk = self.chunks.get(index)
+                if chunk is None:
+                    # Unloaded chunks are rendered from the block store when needed
+                    continue
+                local = rect.move(-index * width, 0).clip(chunk.get_rect())
+                chunk.blit(self.backdrop, local, local)
+                if self.view_offset is not None:
+                    dest = local.move(index * width - self.view_offset, 0)
+                    self.background.blit(chunk, dest, local)
+                    self.dirty_rects.append(dest)
+        self.drawn_alive[:] = blocks.alive
+    
+    def _draw_animating_blocks(self):
+        """Draw blocks still playing their destroy animation. Returns the areas drawn."""
+        blocks = self.blocks
+        animating = blocks.animating
+        left, right = self.camera.visible(blocks.width)
+        animating = animating[(blocks.x[animating] > left) & (blocks.x[animating] < right)]
+        if len(animating) == 0:
+            return []
+        offset = self.camera.offset
+        atlas = Colors.block_atlas()
+        return self.screen.blits([(atlas.surface, (x - offset, y), atlas.frame(level, scale))
+                                  for x, y, level, scale in zip(blocks.x[animating].astype(int).tolist(),
+                                                                blocks.y[animating].astype(int).tolist(),
+                                                                blocks.levels[animating].tolist(),
+                                                                blocks.anim[animating].tolist())])
+    
+    def _render_text(self, font, text, color):
+        """Render text through the cache so it is only rasterized when it changes."""
+        return self.text_cache.render(font, text, color)
+    
+    def _overlay(self, alpha):
+        """Get a cached full-window dimming overlay for the current theme."""
+        key = (alpha, Colors.theme_version)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            overlay = pygame.Surface((Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT))
+            overlay.set_alpha(alpha)
+            overlay.fill((0, 0, 0))
+            self.overlays = {k: v for k, v in self.overlays.items()
+                             if k[1] == Colors.theme_version}
+            self.overlays[key] = overlay
+        return overlay
     
     def _draw_ui(self):
-        """Draw UI elements."""
+        """Draw UI elements. Returns the areas drawn."""
+        rects = []
+        
         # Score
-        score_text = self.font.render(f"Score: {self.score}", True, Colors.TEXT)
-        self.screen.blit(score_text, (20, 20))
+        score_text = self._render_text(self.font, f"Score: {self.score}", Colors.TEXT)
+        rects.append(self.screen.blit(score_text, (20, 20)))
         
         # Lives
-        lives_text = self.font.render(f"Lives: {self.lives}", True, Colors.TEXT)
-        self.screen.blit(lives_text, (Config.WINDOW_WIDTH - 150, 20))
+        lives_text = self._render_text(self.font, f"Lives: {self.lives}", Colors.TEXT)
+        rects.append(self.screen.blit(lives_text, (Config.WINDOW_WIDTH - 150, 20)))
+        
+        # Board progress for multi-year histories
+        if self.sim.board_count > 1:
+            board_text = self._render_text(self.small_font, f"Board {self.sim.board + 1}/{self.sim.board_count}",
+                                           Colors.TEXT_SECONDARY)
+            text_rect = board_text.get_rect(center=(Config.WINDOW_WIDTH // 2, 32))
+            rects.append(self.screen.blit(board_text, text_rect))
         
         # Instructions
         if self.ball.attached:
-            inst_text = self.small_font.render("Press SPACE to launch", True, Colors.TEXT_SECONDARY)
+            inst_text = self._render_text(self.small_font, "Press SPACE to launch", Colors.TEXT_SECONDARY)
             text_rect = inst_text.get_rect(center=(Config.WINDOW_WIDTH // 2, Config.WINDOW_HEIGHT - 50))
-            self.screen.blit(inst_text, text_rect)
+            rects.append(self.screen.blit(inst_text, text_rect))
+        
+        return rects
+    
+    def _draw_loading(self):
+        """Draw the loading screen, only when its animation moves on."""
+        # perf_counter rather than pygame.time: the SDL timer isn't initialized
+        dots = int((time.perf_counter() - self.created) / 0.4) % 4
+        state = ('loading', dots, Colors.theme_version)
+        if state == self.overlay_drawn:
+            return []
+        self.overlay_drawn = state
+        
+        if self.background is None or self.background_dark_mode != self.dark_mode:
+            self._build_background()
+        for x in range(0, self.screen.get_width(), Config.CHUNK_WIDTH):
+            self.screen.blit(self.backdrop, (x, 0))
+        
+        text = self._render_text(self.font, "Loading contributions" + "." * dots, Colors.TEXT)
+        text_rect = text.get_rect(midleft=(Config.WINDOW_WIDTH // 2 - 150, Config.WINDOW_HEIGHT // 2))
+        self.screen.blit(text, text_rect)
+        
+        self.full_redraw = True
+        self.dirty_rects = [self.screen.get_rect()]
+        return None
     
     def _draw_pause_overlay(self):
         """Draw pause screen overlay."""
-        overlay = pygame.Surface((Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self._overlay(128), (0, 0))
         
-        pause_text = self.font.render("PAUSED", True, Colors.TEXT)
+        pause_text = self._render_text(self.font, "PAUSED", Colors.TEXT)
         text_rect = pause_text.get_rect(center=(Config.WINDOW_WIDTH // 2, Config.WINDOW_HEIGHT // 2))
         self.screen.blit(pause_text, text_rect)
         
-        inst_text = self.small_font.render("Press P to resume", True, Colors.TEXT_SECONDARY)
+        inst_text = self._render_text(self.small_font, "Press P to resume", Colors.TEXT_SECONDARY)
         inst_rect = inst_text.get_rect(center=(Config.WINDOW_WIDTH // 2, Config.WINDOW_HEIGHT // 2 + 40))
         self.screen.blit(inst_text, inst_rect)
     
     def _draw_game_over(self):
         """Draw game over screen."""
-        overlay = pygame.Surface((Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT))
-        overlay.set_alpha(192)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self._overlay(192), (0, 0))
         
         if self.lives <= 0:
             text = "GAME OVER"
@@ -361,14 +547,14 @@ class BreakoutGame:
             text = "YOU WIN!"
             color = Colors.CONTRIB_HIGH
         
-        game_over_text = self.font.render(text, True, color)
+        game_over_text = self._render_text(self.font, text, color)
         text_rect = game_over_text.get_rect(center=(Config.WINDOW_WIDTH // 2, Config.WINDOW_HEIGHT // 2 - 40))
         self.screen.blit(game_over_text, text_rect)
         
-        score_text = self.font.render(f"Final Score: {self.score}", True, Colors.TEXT)
+        score_text = self._render_text(self.font, f"Final Score: {self.score}", Colors.TEXT)
         score_rect = score_text.get_rect(center=(Config.WINDOW_WIDTH // 2, Config.WINDOW_HEIGHT // 2))
         self.screen.blit(score_text, score_rect)
         
-        inst_text = self.small_font.render("Press ESC to exit", True, Colors.TEXT_SECONDARY)
+        inst_text = self._render_text(self.small_font, "Press ESC to exit", Colors.TEXT_SECONDARY)
         inst_rect = inst_text.get_rect(center=(Config.WINDOW_WIDTH // 2, Config.WINDOW_HEIGHT // 2 + 40))
         self.screen.blit(inst_text, inst_rect)
\ No newline at end of file
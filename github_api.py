@@ -2,14 +2,214 @@
 GitHub API integration for fetching contribution data
 """
 
-import requests
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timedelta
+import numpy as np
+from config import Config
+from contributions import ContributionCalendar, generate_mock_calendars, to_date
 import json
 
+CALENDAR_FIELDS = """
+            contributionCalendar {
+                totalContributions
+                weeks {
+                    contributionDays {
+                        contributionCount
+                        date
+                    }
+                }
+            }
+"""
+
+CONTRIBUTIONS_QUERY = """
+query($username: String!, $from: DateTime!, $to: DateTime!) {
+    user(login: $username) {
+        contributionsCollection(from: $from, to: $to) {%s        }
+    }
+}
+""" % CALENDAR_FIELDS
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Get the shared HTTP session so all requests reuse pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Imported here so startup doesn't pay for requests before the first fetch
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=Config.GITHUB_MAX_WORKERS)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+class RateLimiter:
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = 0
+        self.lock = threading.Lock()
+    
+    def wait(self, cancel=None):
+        """
+        Sleep until the rate limit resets if the request budget is nearly spent.
+        Setting the optional cancel event cuts the wait short.
+        """
+        with self.lock:
+            delay = 0
+            if self.remaining is not None and self.remaining <= Config.GITHUB_RATE_LIMIT_RESERVE:
+                delay = self.reset_at - time.time()
+        if delay > 0:
+            sleep(delay, cancel)
+    
+    def update(self, response):
+        """Record the budget reported by GitHub's rate-limit headers."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        with self.lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = int(reset)
+    
+    def is_limited(self, response):
+        """Check whether a failed response was caused by rate limiting."""
+        return (response.status_code == 429 or 'Retry-After' in response.headers or
+                response.headers.get('X-RateLimit-Remaining') == '0')
+    
+    def retry_delay(self, response, attempt):
+        """Get how long to wait before retrying a failed request."""
+        if response is not None:
+            if 'Retry-After' in response.headers:
+                return float(response.headers['Retry-After'])
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                return max(0, self.reset_at - time.time())
+        # Exponential backoff with jitter
+        return Config.GITHUB_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random())
+
+rate_limiter = RateLimiter()
+
+def sleep(delay, cancel=None):
+    """Sleep for delay seconds, waking early if the cancel event is set."""
+    if cancel is None:
+        time.sleep(delay)
+    else:
+        cancel.wait(delay)
+
+def post_graphql(api_url, query, variables, headers, cancel=None):
+    """
+    Send a GraphQL query over the shared session, retrying transient failures.
+    Each request times out after Config.GITHUB_TIMEOUT; setting the optional
+    cancel event stops further attempts. Returns the decoded response body, or None.
+    """
+    from requests import RequestException
+    
+    error = None
+    for attempt in range(Config.GITHUB_RETRIES + 1):
+        rate_limiter.wait(cancel)
+        if cancel is not None and cancel.is_set():
+            return None
+        response = None
+        try:
+            response = get_session().post(
+                api_url,
+                json={'query': query, 'variables': variables},
+                headers=headers,
+                timeout=Config.GITHUB_TIMEOUT
+            )
+        except RequestException as e:
+            error = e
+        else:
+            rate_limiter.update(response)
+            if response.status_code == 200:
+                try:
+                    return response.json()
+                except ValueError as e:
+                    # Proxy or captive portal pages and truncated bodies aren't JSON
+                    error = f"invalid response ({e})"
+            else:
+                error = response.status_code
+                retryable = response.status_code >= 500 or rate_limiter.is_limited(response)
+                if not retryable:
+                    break
+        
+        if attempt < Config.GITHUB_RETRIES:
+            sleep(rate_limiter.retry_delay(response, attempt), cancel)
+    
+    print(f"Error fetching GitHub data: {error}")
+    return None
+
+def parse_calendar(collection):
+    """Flatten a contributionsCollection into a list of date/count dictionaries."""
+    contributions = []
+    for week in collection['contributionCalendar']['weeks']:
+        for day in week['contributionDays']:
+            contributions.append({
+                'date': day['date'],
+                'count': day['contributionCount']
+            })
+    return contributions
+
+def last_year():
+    """Get the first and last day of the last year as 'YYYY-MM-DD'."""
+    today = datetime.now()
+    start = today - timedelta(days=364)
+    return start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+
+def covers(calendar, end):
+    """
+    Check whether a cached calendar reaches the 'YYYY-MM-DD' day end. Ranges
+    ending today only need yesterday, as today's count may still grow.
+    """
+    yesterday = (datetime.now() - timedelta(days=1)).date()
+    return calendar.end >= min(to_date(end), yesterday)
+
+def year_ranges(start, end):
+    """
+    Split a 'YYYY-MM-DD' range into consecutive spans of at most one year,
+    the longest range a single contributionsCollection query accepts.
+    """
+    first = datetime.strptime(start, '%Y-%m-%d')
+    last = datetime.strptime(end, '%Y-%m-%d')
+    ranges = []
+    while first <= last:
+        span_end = min(last, first + timedelta(days=364))
+        ranges.append((first.strftime('%Y-%m-%d'), span_end.strftime('%Y-%m-%d')))
+        first = span_end + timedelta(days=1)
+    return ranges
+
+def merge_contributions(chunks, start, end):
+    """
+    Merge fetched chunks into one gap-free calendar covering start to end.
+    Days are indexed by their offset from start; days no chunk covers count as 0.
+    """
+    first = to_date(start).toordinal()
+    counts = np.zeros(to_date(end).toordinal() - first + 1, dtype=np.uint16)
+    for chunk in chunks:
+        for day in chunk:
+            offset = to_date(day['date']).toordinal() - first
+            if 0 <= offset < len(counts):
+                counts[offset] = min(day['count'], np.iinfo(np.uint16).max)
+    return ContributionCalendar(start, counts)
+
 class GitHubAPI:
-    def __init__(self, username, token=None):
+    def __init__(self, username, token=None, cache=None, start=None, end=None, mock_seed=None):
         self.username = username
         self.token = token
+        self.cache = cache
+        self.mock_seed = mock_seed
+        
+        # Date range to fetch ('YYYY-MM-DD', inclusive); defaults to the last year
+        default_start, default_end = last_year()
+        self.start = start or default_start
+        self.end = end or default_end
+        self.api_url = os.getenv('GITHUB_API_URL', Config.GITHUB_API_URL)
         self.headers = {}
         
         if token:
@@ -17,8 +217,10 @@ class GitHubAPI:
     
     def get_contributions(self):
         """
-        Fetch GitHub contributions for the last year.
-        Returns a list of dictionaries with date and contribution count.
+        Fetch GitHub contributions for the configured date range.
+        Returns a ContributionCalendar with one count per day from start to end.
+        Fresh cached data is returned without touching the network; stale
+        data is topped up with only the days missing from the cache.
         """
         # GitHub doesn't provide a direct API for contribution graph
         # We'll use the GraphQL API to get contribution data
@@ -27,100 +229,305 @@ class GitHubAPI:
             # Fallback to mock data if no token provided
             return self._generate_mock_contributions()
         
-        try:
-            # GraphQL query for contributions
-            query = """
-            query($username: String!) {
-                user(login: $username) {
-                    contributionsCollection {
-                        contributionCalendar {
-                            totalContributions
-                            weeks {
-                                contributionDays {
-                                    contributionCount
-                                    date
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            """
-            
-            response = requests.post(
-                'https://api.github.com/graphql',
-                json={'query': query, 'variables': {'username': self.username}},
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Extract contributions
-                contributions = []
-                weeks = data['data']['user']['contributionsCollection']['contributionCalendar']['weeks']
-                
-                for week in weeks:
-                    for day in week['contributionDays']:
-                        contributions.append({
-                            'date': day['date'],
-                            'count': day['contributionCount']
-                        })
-                
-                # Get last 365 days
-                return contributions[-365:]
-            else:
-                print(f"Error fetching GitHub data: {response.status_code}")
+        if self.cache is None:
+            contributions = self._fetch_range(self.start, self.end)
+            if contributions is None:
                 return self._generate_mock_contributions()
-                
-        except Exception as e:
-            print(f"Error fetching GitHub contributions: {e}")
-            return self._generate_mock_contributions()
+            return contributions
+        
+        cached = self.get_cached_contributions()
+        if (cached and self.cache.is_fresh(self.username) and covers(cached, self.end) and
+                not self.cache.gaps(self.username, self.start, self.end)):
+            return cached
+        return self.refresh() or cached or self._generate_mock_contributions()
+    
+    def get_cached_contributions(self):
+        """Get the date range from the local cache without any network access, or None."""
+        if self.cache is None:
+            return None
+        cached = self.cache.load(self.username, self.start, self.end)
+        if cached is None or cached.start != to_date(self.start):
+            # Missing the start of the range; only a full fetch can fill it
+            return None
+        return cached
+    
+    def refresh(self, cancel=None):
+        """
+        Fetch the days of the range missing from the cache: gaps between
+        cached days and the days after the last one.
+        Returns the updated date range, or None if the fetch failed or was cancelled.
+        """
+        start, end = self.start, self.end
+        first, last = self.cache.date_range(self.username)
+        
+        spans = [(start, end)]
+        if first is not None and first <= start and last >= start:
+            spans = self.cache.gaps(self.username, start, end)
+            if last <= str(end):
+                # Re-fetch the last cached day too, it may have gained contributions
+                spans.append((last, end))
+        
+        for span_start, span_end in spans:
+            contributions = self._fetch_range(span_start, span_end, cancel)
+            if contributions is None:
+                return None
+            self.cache.store(self.username, contributions)
+        return self.cache.load(self.username, start, end)
+    
+    def _fetch_range(self, start, end, cancel=None):
+        """
+        Fetch contributions between two 'YYYY-MM-DD' days.
+        Ranges longer than a year are fetched one year per query, concurrently.
+        Returns a merged ContributionCalendar, or None.
+        """
+        chunks = [chunk for _, chunk in self.iter_range(start, end, cancel)]
+        if cancel is not None and cancel.is_set():
+            return None
+        if not chunks or any(chunk is None for chunk in chunks):
+            return None
+        return merge_contributions(chunks, start, end)
+    
+    def iter_range(self, start, end, cancel=None):
+        """
+        Yield ((start, end), chunk) for each year of a date range as it arrives.
+        Years are fetched concurrently; chunk is None if a year failed. Setting
+        the optional cancel event stops queued and retrying requests, and ends
+        the iteration early.
+        """
+        ranges = year_ranges(start, end)
+        if not ranges:
+            return
+        if cancel is None and len(ranges) == 1:
+            yield ranges[0], self._fetch_year(start, end)
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=min(len(ranges), Config.GITHUB_MAX_WORKERS))
+        futures = {pool.submit(self._fetch_year, *r, cancel): r for r in ranges}
+        pending = set(futures)
+        try:
+            while pending:
+                # Wake up regularly so cancelling doesn't wait on requests in flight
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                if cancel is not None and cancel.is_set():
+                    return
+                for future in done:
+                    yield futures[future], future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _fetch_year(self, start, end, cancel=None):
+        """
+        Fetch contributions between two 'YYYY-MM-DD' days (at most one year apart).
+        Returns a list of dictionaries with date and contribution count, or None.
+        """
+        data = post_graphql(self.api_url, CONTRIBUTIONS_QUERY,
+                            {'username': self.username,
+                             'from': f'{start}T00:00:00Z',
+                             'to': f'{end}T23:59:59Z'},
+                            self.headers, cancel)
+        
+        try:
+            return parse_calendar(data['data']['user']['contributionsCollection'])
+        except (KeyError, TypeError) as e:
+            if data is not None:
+                print(f"Error fetching GitHub contributions: {e}")
+            return None
     
     def _generate_mock_contributions(self):
         """
         Generate mock contribution data for testing.
-        Creates a realistic-looking contribution pattern.
-        """
-        import random
-        
-        contributions = []
-        today = datetime.now()
-        
-        for i in range(365):
-            date = today - timedelta(days=i)
-            
-            # Create realistic patterns
-            # Weekends typically have fewer contributions
-            is_weekend = date.weekday() in [5, 6]
-            
-            # Base probability of contributions
-            if is_weekend:
-                base_prob = 0.3
-            else:
-                base_prob = 0.7
-            
-            # Determine if there are contributions
-            if random.random() < base_prob:
-                # Generate contribution count with realistic distribution
-                # Most days have 1-5 contributions, some have more
-                weights = [0.3, 0.25, 0.2, 0.1, 0.05, 0.04, 0.03, 0.02, 0.01]
-                counts = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-                
-                count = random.choices(counts, weights=weights)[0]
-                
-                # Occasionally have high contribution days
-                if random.random() < 0.05:
-                    count = random.randint(10, 20)
+        Creates a realistic-looking contribution pattern, reproducible with mock_seed.
+        """
+        days = (to_date(self.end) - to_date(self.start)).days + 1
+        return generate_mock_calendars(1, days, seed=self.mock_seed, end=self.end)[0]
+
+class ContributionLoader:
+    """
+    Loads a user's contributions on a background thread so the window never
+    waits on the network. Partial calendars are published as years arrive;
+    the game picks them up with poll().
+    """
+    def __init__(self, api, timeout=None):
+        self.api = api
+        self.timeout = Config.GITHUB_LOAD_TIMEOUT if timeout is None else timeout
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.contributions = None
+        self.updated = False
+        self.done = False
+        self.thread = None
+        self.timer = None
+    
+    def start(self):
+        """Start loading; gives up and falls back after the timeout."""
+        self.thread = threading.Thread(target=self._run, name='contribution-loader', daemon=True)
+        self.thread.start()
+        if self.timeout:
+            self.timer = threading.Timer(self.timeout, self.cancel)
+            self.timer.daemon = True
+            self.timer.start()
+        return self
+    
+    def cancel(self):
+        """Stop loading as soon as possible; requests already in flight end at their timeout."""
+        self.cancelled.set()
+    
+    def poll(self):
+        """
+        Get (contributions, done) if anything changed since the last poll, else None.
+        done is True once the calendar is final.
+        """
+        with self.lock:
+            if not self.updated:
+                return None
+            self.updated = False
+            return self.contributions, self.done
+    
+    def _publish(self, contributions):
+        with self.lock:
+            self.contributions = contributions
+            self.updated = True
+    
+    def _run(self):
+        try:
+            self._load()
+        except Exception as e:
+            print(f"Error loading GitHub contributions: {e}")
+        finally:
+            if self.contributions is None:
+                # Same fallback as GitHubAPI.get_contributions
+                self._publish(self.api._generate_mock_contributions())
+            if self.timer is not None:
+                self.timer.cancel()
+            with self.lock:
+                self.done = True
+                self.updated = True
+    
+    def _load(self):
+        api = self.api
+        if not api.token:
+            self._publish(api._generate_mock_contributions())
+            return
+        
+        # Cached days first, then top them up with only the missing days. Gaps
+        # would show as days without contributions, so those wait for the fetch
+        cached = api.get_cached_contributions()
+        if cached is not None:
+            complete = not api.cache.gaps(api.username, api.start, api.end)
+            if complete:
+                self._publish(cached)
+            if not complete or not api.cache.is_fresh(api.username) or not covers(cached, api.end):
+                refreshed = api.refresh(self.cancelled)
+                if refreshed is not None:
+                    self._publish(refreshed)
+                elif not complete:
+                    self._publish(cached)
+            return
+        
+        # Nothing cached: publish the oldest years as soon as they are complete,
+        # so the first boards can be played while later years are still loading
+        chunks = {}
+        ranges = year_ranges(api.start, api.end)
+        published = 0
+        for span, chunk in api.iter_range(api.start, api.end, self.cancelled):
+            if chunk is None:
+                return
+            chunks[span] = chunk
+            ready = published
+            while ready < len(ranges) and ranges[ready] in chunks:
+                ready += 1
+            if ready > published:
+                published = ready
+                end = ranges[ready - 1][1]
+                self._publish(merge_contributions([chunks[r] for r in ranges[:ready]], api.start, end))
+        
+        if published == len(ranges) and api.cache is not None:
+            api.cache.store(api.username, self.contributions)
+
+class GitHubBatchClient:
+    def __init__(self, token, cache=None, max_workers=None, users_per_query=None):
+        self.token = token
+        self.cache = cache
+        self.max_workers = max_workers or Config.GITHUB_MAX_WORKERS
+        self.users_per_query = users_per_query or Config.GITHUB_USERS_PER_QUERY
+        self.api_url = os.getenv('GITHUB_API_URL', Config.GITHUB_API_URL)
+        self.headers = {'Authorization': f'token {token}'}
+    
+    def iter_contributions(self, usernames, start=None, end=None):
+        """
+        Yield (username, contributions) for many users as each one arrives.
+        Fresh cached users come first; the rest are fetched several users per
+        query on a thread pool. contributions is None when a user can't be fetched.
+        """
+        if start is None or end is None:
+            start, end = last_year()
+        
+        pending = []
+        for username in usernames:
+            cached = self._load_cached(username, start, end)
+            if cached is not None:
+                yield username, cached
             else:
-                count = 0
-            
-            contributions.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'count': count
-            })
+                pending.append(username)
         
-        # Reverse to have oldest first
-        contributions.reverse()
+        batches = [pending[i:i + self.users_per_query]
+                   for i in range(0, len(pending), self.users_per_query)]
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {pool.submit(self._fetch_batch, batch, start, end): batch for batch in batches}
+        try:
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # One failed batch shouldn't end the stream for everyone else
+                    print(f"Error fetching GitHub contributions: {e}")
+                    results = [(username, None) for username in futures[future]]
+                for username, contributions in results:
+                    if contributions is not None and self.cache is not None:
+                        self.cache.store(username, contributions)
+                    yield username, contributions
+        finally:
+            # Stop queued batches if the caller stops early
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+    
+    def get_contributions(self, usernames, start=None, end=None):
+        """Fetch many users' contributions into a dictionary keyed by username."""
+        return dict(self.iter_contributions(usernames, start, end))
+    
+    def _load_cached(self, username, start, end):
+        """Get a user's fresh, complete cached range, or None."""
+        if self.cache is None or not self.cache.is_fresh(username):
+            return None
+        cached = self.cache.load(username, start, end)
+        if (cached is None or cached.start != to_date(start) or not covers(cached, end) or
+                self.cache.gaps(username, start, end)):
+            return None
+        return cached
+    
+    def _fetch_batch(self, usernames, start, end):
+        """
+        Fetch a batch of users in one query using GraphQL aliases. Ranges over
+        a year get one aliased collection per user and year, merged afterwards.
+        """
+        ranges = year_ranges(start, end)
+        fields = []
+        for i, username in enumerate(usernames):
+            collections = ''.join(
+                '\n        y%d: contributionsCollection(from: "%sT00:00:00Z", to: "%sT23:59:59Z") {%s        }'
+                % (j, span_start, span_end, CALENDAR_FIELDS)
+                for j, (span_start, span_end) in enumerate(ranges))
+            fields.append('u%d: user(login: %s) {%s\n    }' % (i, json.dumps(username), collections))
+        query = 'query {\n    %s\n}' % '\n    '.join(fields)
         
-        return contributions
\ No newline at end of file
+        data = post_graphql(self.api_url, query, {}, self.headers)
+        results = []
+        for i, username in enumerate(usernames):
+            try:
+                user = data['data'][f'u{i}']
+                results.append((username, merge_contributions(
+                    [parse_calendar(user[f'y{j}']) for j in range(len(ranges))], start, end)))
+            except (KeyError, TypeError):
+                results.append((username, None))
+        return results
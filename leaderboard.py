@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Persistent high scores and leaderboards.
+
+Every finished game is kept, and each player's best score per date range is
+ranked. Writes are queued and committed in batches by a background thread so the
+game loop never waits on the disk.
+
+Usage: python leaderboard.py [--user NAME] [--from 2024-01-01 --to 2024-12-31] [--top 10]
+       python leaderboard.py --bench 1000000
+"""
+
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from config import Config
+from contributions import to_date
+
+# Stops the writer thread
+_CLOSE = object()
+
+def _range_key(start, end):
+    """Normalize a date range to the 'YYYY-MM-DD' strings it is stored under."""
+    return str(to_date(start)), str(to_date(end))
+
+class Leaderboard:
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path or Config.LEADERBOARD_PATH)
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Readers use this connection, guarded by lock; WAL lets them run while
+        # the writer thread commits on its own connection
+        self.connection = self._connect()
+        with self.lock, self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    range_start TEXT NOT NULL,
+                    range_end TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    lives INTEGER NOT NULL,
+                    boards INTEGER NOT NULL,
+                    played_at REAL NOT NULL
+                )
+            """)
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS games_by_user ON games (username, played_at)")
+            # Each player's best score per range, ranked through the score index
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS best (
+                    range_start TEXT NOT NULL,
+                    range_end TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    played_at REAL NOT NULL,
+                    PRIMARY KEY (range_start, range_end, username)
+                ) WITHOUT ROWID
+            """)
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS best_by_score ON best (range_start, range_end, score DESC)")
+            # How many players have each best score, so a rank sums distinct scores
+            # instead of counting every player above
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS best_counts (
+                    range_start TEXT NOT NULL,
+                    range_end TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    players INTEGER NOT NULL,
+                    PRIMARY KEY (range_start, range_end, score)
+                ) WITHOUT ROWID
+            """)
+        
+        self.writer = threading.Thread(target=self._write_loop, name='leaderboard-writer', daemon=True)
+        self.writer.start()
+    
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints; a crash can lose the
+        # last few games but never corrupts the database
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def submit(self, username, start, end, score, lives=0, boards=0):
+        """Queue a finished game on a date range; returns immediately."""
+        self.queue.put((username, *_range_key(start, end), int(score),
+                        int(lives), int(boards), time.time()))
+    
+    def flush(self):
+        """Wait until every queued game is written."""
+        self.queue.join()
+    
+    def _write_loop(self):
+        connection = self._connect()
+        closing = False
+        while not closing:
+            games = [self.queue.get()]
+            # Give a burst of submissions a moment to arrive so they share a commit
+            deadline = time.monotonic() + Config.LEADERBOARD_BATCH_DELAY
+            while len(games) < Config.LEADERBOARD_BATCH_SIZE:
+                try:
+                    games.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if _CLOSE in games:
+                closing = True
+                games = [game for game in games if game is not _CLOSE]
+            try:
+                with connection:
+                    self._write(connection, games)
+            except sqlite3.Error as e:
+                print(f"Error saving scores: {e}")
+            finally:
+                for _ in range(len(games) + (1 if closing else 0)):
+                    self.queue.task_done()
+        connection.close()
+    
+    def _write(self, connection, games):
+        """Insert games and update the best scores and their counts in one transaction."""
+        connection.executemany(
+            "INSERT INTO games (username, range_start, range_end, score, lives, boards, played_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", games)
+        for username, start, end, score, _, _, played_at in games:
+            row = connection.execute(
+                "SELECT score FROM best WHERE range_start = ? AND range_end = ? AND username = ?",
+                (start, end, username)).fetchone()
+            if row is not None and row[0] >= score:
+                continue
+            if row is not None:
+                connection.execute(
+                    "UPDATE best_counts SET players = players - 1 "
+                    "WHERE range_start = ? AND range_end = ? AND score = ?", (start, end, row[0]))
+                connection.execute(
+                    "DELETE FROM best_counts WHERE range_start = ? AND range_end = ? AND score = ? "
+                    "AND players = 0", (start, end, row[0]))
+            connection.execute(
+                "INSERT OR REPLACE INTO best (range_start, range_end, username, score, played_at) "
+                "VALUES (?, ?, ?, ?, ?)", (start, end, username, score, played_at))
+            connection.execute(
+                "INSERT INTO best_counts (range_start, range_end, score, players) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (range_start, range_end, score) DO UPDATE SET players = players + 1",
+                (start, end, score))
+    
+    def top(self, start, end, k=10):
+        """Get the k best (username, score) pairs for a date range, highest first."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT username, score FROM best WHERE range_start = ? AND range_end = ? "
+                "ORDER BY score DESC LIMIT ?", (*_range_key(start, end), k)).fetchall()
+    
+    def rank(self, username, start, end):
+        """
+        Get a player's (rank, best score, players) for a date range, or None if
+        they haven't played it. Tied players share a rank.
+        """
+        start, end = _range_key(start, end)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT score FROM best WHERE range_start = ? AND range_end = ? AND username = ?",
+                (start, end, username)).fetchone()
+            if row is None:
+                return None
+            above, players = self.connection.execute(
+                "SELECT TOTAL(CASE WHEN score > ? THEN players END), TOTAL(players) "
+                "FROM best_counts WHERE range_start = ? AND range_end = ?",
+                (row[0], start, end)).fetchone()
+        return int(above) + 1, row[0], int(players)
+    
+    def history(self, username, limit=10):
+        """Get a player's most recent games as (score, lives, boards, played_at), newest first."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT score, lives, boards, played_at FROM games WHERE username = ? "
+                "ORDER BY played_at DESC LIMIT ?", (username, limit)).fetchall()
+    
+    def close(self):
+        """Write any queued games, then close the database."""
+        self.queue.put(_CLOSE)
+        self.writer.join()
+        with self.lock:
+            self.connection.close()
+
+def benchmark(path, rows):
+    """Fill a leaderboard with synthetic players and time top-K and rank queries."""
+    import numpy as np
+    
+    span = ('2024-01-01', '2024-12-31')
+    leaderboard = Leaderboard(path)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for i, score in enumerate((rng.gamma(2.0, 1500, rows) // 10 * 10).astype(int).tolist()):
+        leaderboard.submit(f"player{i}", *span, score)
+    submitted = time.perf_counter() - start
+    leaderboard.flush()
+    written = time.perf_counter() - start
+    
+    names = [name for name, _ in leaderboard.top(*span, 1000)]
+    timings = {}
+    for name, query in (('top 10', lambda i: leaderboard.top(*span, 10)),
+                        ('rank', lambda i: leaderboard.rank(names[i % len(names)], *span))):
+        samples = []
+        for i in range(1000):
+            begin = time.perf_counter()
+            query(i)
+            samples.append(time.perf_counter() - begin)
+        timings[name] = np.asarray(samples) * 1000
+    leaderboard.close()
+    
+    print(f"Submitted {rows} games in {submitted * 1000:.0f} ms, written after {written:.1f} s")
+    for name, ms in timings.items():
+        print(f"{name}: mean {ms.mean():.3f} ms, p99 {np.percentile(ms, 99):.3f} ms")
+
+def main():
+    from github_api import last_year
+    
+    parser = argparse.ArgumentParser(description="Show the leaderboard for a date range.")
+    parser.add_argument('--from', dest='start', help="first day of the range (default: as the game)")
+    parser.add_argument('--to', dest='end', help="last day of the range (default: as the game)")
+    parser.add_argument('--user', help="also show this player's rank and recent games")
+    parser.add_argument('--top', type=int, default=10, help="players to list")
+    parser.add_argument('--path', help="database to use instead of the configured one")
+    parser.add_argument('--bench', type=int, metavar='ROWS',
+                        help="time queries over this many synthetic games in a scratch database")
+    args = parser.parse_args()
+    
+    if args.bench:
+        benchmark(args.path or 'leaderboard_bench.db', args.bench)
+        return
+    
+    # Same defaults as GitHubAPI, so games played on the default range match
+    default_start, default_end = last_year()
+    start, end = _range_key(args.start or default_start, args.end or default_end)
+    
+    leaderboard = Leaderboard(args.path)
+    print(f"Leaderboard for {start} to {end}:")
+    for place, (username, score) in enumerate(leaderboard.top(start, end, args.top), 1):
+        print(f"{place:>4}. {username:<24} {score:>8}")
+    if args.user:
+        rank = leaderboard.rank(args.user, start, end)
+        if rank is None:
+            print(f"{args.user} has no games in this range")
+        else:
+            print(f"{args.user}: rank {rank[0]} of {rank[2]} with {rank[1]}")
+        for score, lives, boards, played_at in leaderboard.history(args.user):
+            print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(played_at))}  "
+                  f"score {score}, {lives} lives left, {boards} boards")
+    leaderboard.close()
+
+if __name__ == "__main__":
+    main()
@@ -5,32 +5,46 @@ Copyright © 2024 3S Holding OÜ, Tartu, Estonia
 Created by Prof. Shahab Anbarjafari
 """
 
+import gc
+import time
+STARTUP = time.perf_counter()
+
 import pygame
 import sys
 from game import BreakoutGame
-from github_api import GitHubAPI
+from github_api import GitHubAPI, ContributionLoader
+from contribution_cache import ContributionCache
+from leaderboard import Leaderboard
 from config import Config
+from utils.pacing import FramePacer, display_rate
+from utils.profiler import Profiler, StartupTimer
 import os
 from dotenv import load_dotenv
 
 def main():
     """Main entry point for the game."""
+    startup = StartupTimer(STARTUP)
+    startup.mark('imports')
+    
     # Load environment variables
     load_dotenv()
     
-    # Initialize Pygame
-    pygame.init()
-    pygame.mixer.init()
+    # Initialize only the Pygame modules the game uses
+    pygame.display.init()
+    pygame.font.init()
+    if Config.SOUND_ENABLED:
+        pygame.mixer.init()
+    startup.mark('init')
     
     # Set up display
     screen = pygame.display.set_mode((Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT))
     pygame.display.set_caption("GitHub Contribution Breakout")
+    startup.mark('window')
     
-    # Create clock for FPS control
-    clock = pygame.time.Clock()
+    # Render at the display's refresh rate; physics keeps its own fixed rate
+    pacer = FramePacer(display_rate())
     
     # Get GitHub data
-    print("Fetching your GitHub contributions...")
     github_username = os.getenv('GITHUB_USERNAME')
     github_token = os.getenv('GITHUB_TOKEN')
     
@@ -38,40 +52,130 @@ def main():
         print("Error: GITHUB_USERNAME not set in .env file")
         sys.exit(1)
     
-    github_api = GitHubAPI(github_username, github_token)
-    contributions = github_api.get_contributions()
-    
-    if not contributions:
-        print("Error: Could not fetch GitHub contributions")
-        sys.exit(1)
+    # Optional date range (YYYY-MM-DD); defaults to the last year
+    github_api = GitHubAPI(github_username, github_token, ContributionCache(),
+                           start=os.getenv('GITHUB_FROM'), end=os.getenv('GITHUB_TO'))
     
-    print(f"Successfully loaded {len(contributions)} days of contributions!")
+    # Load on a background thread; the game shows a loading screen meanwhile
+    # and blocks stream in as each year arrives
+    print("Fetching your GitHub contributions...")
+    loader = ContributionLoader(github_api).start()
     
     # Create game instance
-    game = BreakoutGame(screen, contributions)
+    game = BreakoutGame(screen)
+    startup.mark('game')
+    
+    # Scores are saved by a background writer so finishing a game never stalls a frame
+    leaderboard = Leaderboard()
+    score_saved = False
+    
+    # Profiling starts on with PROFILE=1 and toggles with F3
+    if os.getenv('PROFILE') == '1':
+        Profiler.toggle()
+    
+    # RECORD=path saves every input so the game can be replayed with replay.py
+    record_path = os.getenv('RECORD')
+    if record_path:
+        from replay import Replay
+        Replay.record(game.sim)
+    
+    # SPECTATE=port (or host:port) broadcasts the game to spectator.py clients
+    spectate = os.getenv('SPECTATE')
+    spectators = None
+    if spectate:
+        from spectator import SpectatorServer
+        host, _, port = spectate.rpartition(':')
+        try:
+            spectators = SpectatorServer(host or None, int(port)).start()
+            print(f"Broadcasting to spectators on {spectators.host}:{spectators.port}")
+        except OSError as e:
+            print(f"Error starting spectator server on {spectate}: {e}; playing without spectators")
+            spectators = None
     
     # Game loop
     running = True
+    first_frame = True
     while running:
-        dt = clock.tick(Config.FPS) / 1000.0  # Delta time in seconds
+        dt = pacer.tick()  # Delta time in seconds
+        Profiler.end_frame()
+        
+        # Pick up contributions as they arrive
+        update = loader.poll()
+        if update is not None:
+            contributions, done = update
+            game.load(contributions, complete=done)
+            if done:
+                print(f"Successfully loaded {len(contributions)} days of contributions "
+                      f"({(time.perf_counter() - STARTUP) * 1000:.0f} ms after launch)!")
+                # Keep everything built so far out of full collections; with
+                # hundreds of balls those otherwise cost a frame every few seconds
+                gc.freeze()
         
         # Handle events
-        events = pygame.event.get()
-        for event in events:
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
+        with Profiler.phase('events'):
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_F3:
+                        Profiler.toggle()
+                        game.full_redraw = True
         
         # Update game
-        game.update(dt, events)
+        with Profiler.phase('update'):
+            game.update(dt, events)
+        
+        if game.game_over and not score_saved:
+            leaderboard.submit(github_username, github_api.start, github_api.end, game.score,
+                               game.lives, game.sim.board)
+            score_saved = True
+        
+        if spectators is not None and not game.loading:
+            spectators.publish(game.sim)
         
         # Draw everything
-        game.draw()
+        with Profiler.phase('draw'):
+            dirty_rects = game.draw()
+        
+        # Update only the changed areas of the display
+        with Profiler.phase('present'):
+            pygame.display.update(dirty_rects)
         
-        # Update display
-        pygame.display.flip()
+        # Render sprites and text ahead of time while the fetch runs
+        if first_frame:
+            first_frame = False
+            startup.mark('first frame')
+            game.prewarm()
+            startup.mark('prewarm')
+            print(startup.report())
+    
+    if record_path:
+        Replay.from_simulation(game.sim).save(record_path)
+        print(f"Saved replay to {record_path}")
+    
+    loader.cancel()
+    print(pacer.report())
+    
+    # Keep the score of a game quit partway through too
+    if not score_saved and not game.loading and game.score > 0:
+        leaderboard.submit(github_username, github_api.start, github_api.end, game.score,
+                           game.lives, game.sim.board)
+    leaderboard.flush()
+    if not game.loading:
+        rank = leaderboard.rank(github_username, github_api.start, github_api.end)
+        if rank is not None:
+            print(f"Best score {rank[1]}, rank {rank[0]} of {rank[2]} for this date range")
+    leaderboard.close()
+    if spectators is not None:
+        spectators.stop()
+    
+    # Save the profile for a trace viewer
+    if Profiler.trace:
+        Profiler.export_trace(Config.PROFILER_TRACE_PATH)
+        print(f"Saved frame profile to {Config.PROFILER_TRACE_PATH}")
     
     # Cleanup
     pygame.quit()
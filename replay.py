@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Deterministic input recording and headless replay.
+
+A replay stores the seed, the contribution calendar, one packed input byte per
+simulation step and every calendar loaded during the game (such as years
+streaming in), so re-running it reproduces the game exactly.
+
+Usage: python replay.py game.replay [--repeat N]
+"""
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+import numpy as np
+from config import Config
+from contributions import ContributionCalendar
+from datetime import date
+from simulation import InputState, Simulation
+
+# File layout: header, (version 3) weeks per board, calendar counts (uint16 per
+# day), zlib-compressed inputs, then (version 2) a load count and per load a
+# LOAD record and its counts
+MAGIC = b'GHRP'
+VERSION = 3
+HEADER = struct.Struct('<4sHHQIIIIqi')
+WEEKS = struct.Struct('<H')
+COUNT = struct.Struct('<I')
+LOAD = struct.Struct('<IIIB')  # Step, calendar start (proleptic ordinal), days, complete
+
+class Replay:
+    def __init__(self, seed, calendar, inputs, score=None, lives=None, physics_rate=None, loads=(),
+                 weeks_per_board=None):
+        self.seed = seed
+        self.calendar = calendar
+        self.inputs = bytes(inputs)
+        self.loads = list(loads)  # (step, calendar, complete), applied before that step
+        self.score = score
+        self.lives = lives
+        self.physics_rate = physics_rate or Config.PHYSICS_RATE
+        self.weeks_per_board = weeks_per_board or Config.WEEKS_PER_BOARD
+    
+    @classmethod
+    def record(cls, simulation):
+        """Start recording every input a simulation receives from now on."""
+        simulation.input_log = bytearray()
+        simulation.load_log = []
+    
+    @classmethod
+    def from_simulation(cls, simulation):
+        """Capture a recorded simulation, including its result for later verification."""
+        return cls(simulation.seed, simulation.initial_contributions, simulation.input_log,
+                   simulation.score, simulation.lives, loads=simulation.load_log)
+    
+    @classmethod
+    def load(cls, path):
+        """Read a replay written by save()."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        (magic, version, physics_rate, seed, start, days, input_size,
+         ticks, score, lives) = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, 2, VERSION):
+            raise ValueError(f"{path} is not a replay file")
+        
+        offset = HEADER.size
+        # Earlier versions always had 53-week boards
+        weeks_per_board = 53
+        if version >= 3:
+            weeks_per_board, = WEEKS.unpack_from(data, offset)
+            offset += WEEKS.size
+        counts = np.frombuffer(data, dtype='<u2', count=days, offset=offset)
+        offset += days * 2
+        inputs = zlib.decompress(data[offset:offset + input_size])
+        offset += input_size
+        if len(inputs) != ticks:
+            raise ValueError(f"{path} is truncated")
+        
+        # Version 1 replays never loaded a second calendar
+        loads = []
+        if version >= 2:
+            count, = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            for _ in range(count):
+                step, load_start, load_days, complete = LOAD.unpack_from(data, offset)
+                offset += LOAD.size
+                load_counts = np.frombuffer(data, dtype='<u2', count=load_days, offset=offset)
+                offset += load_days * 2
+                loads.append((step, ContributionCalendar(date.fromordinal(load_start), load_counts),
+                              bool(complete)))
+        return cls(seed, ContributionCalendar(date.fromordinal(start), counts), inputs,
+                   None if score < 0 else score, None if lives < 0 else lives, physics_rate, loads,
+                   weeks_per_board)
+    
+    def save(self, path):
+        """Write the replay to a compact binary file."""
+        inputs = zlib.compress(self.inputs, 9)
+        counts = self.calendar.counts.astype('<u2', copy=False)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.physics_rate, self.seed,
+                                self.calendar.start.toordinal(), len(counts), len(inputs),
+                                len(self.inputs),
+                                -1 if self.score is None else self.score,
+                                -1 if self.lives is None else self.lives))
+            f.write(WEEKS.pack(self.weeks_per_board))
+            f.write(counts.tobytes())
+            f.write(inputs)
+            f.write(COUNT.pack(len(self.loads)))
+            for step, calendar, complete in self.loads:
+                load_counts = calendar.counts.astype('<u2', copy=False)
+                f.write(LOAD.pack(step, calendar.start.toordinal(), len(load_counts), complete))
+                f.write(load_counts.tobytes())
+    
+    def run(self, simulation_class=Simulation):
+        """Re-run the recorded inputs as fast as possible and return the finished simulation."""
+        if self.physics_rate != Config.PHYSICS_RATE:
+            raise ValueError(f"Replay was recorded at {self.physics_rate} Hz, "
+                             f"the game now runs at {Config.PHYSICS_RATE} Hz")
+        if self.weeks_per_board != Config.WEEKS_PER_BOARD:
+            raise ValueError(f"Replay was recorded with {self.weeks_per_board} weeks per board; "
+                             f"run it with WEEKS_PER_BOARD={self.weeks_per_board}")
+        simulation = simulation_class(self.calendar, self.seed)
+        decoded = [InputState.decode(bits) for bits in range(32)]
+        loads = self.loads_by_step()
+        for step, bits in enumerate(self.inputs):
+            for calendar, complete in loads.get(step, ()):
+                simulation.load_contributions(calendar, complete)
+            simulation.step(decoded[bits])
+        return simulation
+    
+    def loads_by_step(self):
+        """Get the calendars to load before each step as {step: [(calendar, complete)]}."""
+        loads = {}
+        for step, calendar, complete in self.loads:
+            loads.setdefault(step, []).append((calendar, complete))
+        return loads
+    
+    def verify(self):
+        """Re-run the replay and check it reproduces the recorded score and lives."""
+        simulation = self.run()
+        return simulation.score == self.score and simulation.lives == self.lives
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game headlessly.")
+    parser.add_argument('path', help="replay file written by RECORD=path python main.py")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="run the replay several times to measure speed")
+    args = parser.parse_args()
+    
+    replay = Replay.load(args.path)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        simulation = replay.run()
+    elapsed = (time.perf_counter() - start) / args.repeat
+    
+    game_time = len(replay.inputs) / replay.physics_rate
+    print(f"Replayed {len(replay.inputs)} ticks ({game_time:.1f}s of play) in {elapsed * 1000:.1f} ms "
+          f"({game_time / max(elapsed, 1e-9):.0f}x real time)")
+    print(f"Score: {simulation.score} (recorded {replay.score}), "
+          f"lives: {simulation.lives} (recorded {replay.lives})")
+    
+    if replay.score is not None and (simulation.score, simulation.lives) != (replay.score, replay.lives):
+        print("Error: replay does not reproduce the recorded result")
+        sys.exit(1)
+    print("Replay verified")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+"""
+Headless simulation core for GitHub Contribution Breakout.
+Runs the game rules at a fixed timestep with injected input and no display.
+"""
+
+import math
+import random
+from collections import deque
+import numpy as np
+from config import Config
+from contributions import ContributionCalendar
+from utils.colors import Colors
+from utils.blockstore import BlockStore
+from utils.physics import sweep_circle_rect, sweep_circle_rects, sweep_circles_rects
+from utils.profiler import Profiler
+
+# Bit flags used to pack an InputState into one byte
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_LAUNCH = 4
+INPUT_PAUSE = 8
+INPUT_MULTIBALL = 16
+
+class InputState:
+    def __init__(self, left=False, right=False, launch=False, pause=False, multiball=False):
+        self.left = left
+        self.right = right
+        self.launch = launch
+        self.pause = pause
+        self.multiball = multiball
+    
+    def encode(self):
+        """Pack the input into one byte."""
+        return ((INPUT_LEFT if self.left else 0) | (INPUT_RIGHT if self.right else 0) |
+                (INPUT_LAUNCH if self.launch else 0) | (INPUT_PAUSE if self.pause else 0) |
+                (INPUT_MULTIBALL if self.multiball else 0))
+    
+    @classmethod
+    def decode(cls, bits):
+        """Unpack an input packed by encode()."""
+        return cls(left=bool(bits & INPUT_LEFT), right=bool(bits & INPUT_RIGHT),
+                   launch=bool(bits & INPUT_LAUNCH), pause=bool(bits & INPUT_PAUSE),
+                   multiball=bool(bits & INPUT_MULTIBALL))
+
+class Paddle:
+    # Width of the playfield; wider than the window when a board doesn't fit
+    world_width = Config.WINDOW_WIDTH
+    
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.width = Config.PADDLE_WIDTH
+        self.height = Config.PADDLE_HEIGHT
+        self.speed = Config.PADDLE_SPEED
+        self.color = Colors.PADDLE
+    
+    def update(self, dt, inputs):
+        """Update paddle position based on input."""
+        if inputs.left:
+            self.x = max(0, self.x - self.speed * dt)
+        if inputs.right:
+            self.x = min(self.world_width - self.width, self.x + self.speed * dt)
+
+class Ball:
+    world_width = Config.WINDOW_WIDTH
+    
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.radius = Config.BALL_RADIUS
+        self.vx = Config.BALL_SPEED
+        self.vy = -Config.BALL_SPEED
+        self.color = Colors.BALL
+        self.attached = True
+        self.trail = deque(maxlen=Config.BALL_TRAIL_LENGTH)
+    
+    def update(self, dt, paddle, blocks=None, events=None):
+        """
+        Update ball position and handle collisions.
+        Hits are resolved in time-of-impact order within the step, so the ball
+        cannot tunnel through blocks or the paddle. Wall and paddle bounces are
+        reported to the events list. Returns the indices of blocks hit.
+        """
+        if self.attached:
+            self.x = paddle.x + paddle.width // 2
+            self.y = paddle.y - self.radius - 1
+            return []
+        
+        # Update trail
+        self.trail.append((self.x, self.y))
+        
+        hits = []
+        remaining = dt
+        for _ in range(Config.BALL_MAX_COLLISIONS):
+            dx = self.vx * remaining
+            dy = self.vy * remaining
+            if dx == 0 and dy == 0:
+                break
+            
+            impact = self._find_impact(dx, dy, paddle, blocks)
+            if impact is None:
+                self.x += dx
+                self.y += dy
+                break
+            
+            t, nx, ny, target = impact
+            self.x += dx * t
+            self.y += dy * t
+            remaining *= 1 - t
+            
+            if target is paddle:
+                self._bounce_off_paddle(paddle)
+                self._emit(events, 'spark')
+            elif target is None:
+                # Wall
+                if nx:
+                    self.vx = -self.vx
+                else:
+                    self.vy = -self.vy
+                self._emit(events, 'spark')
+            else:
+                # Block
+                if nx:
+                    self.vx = -self.vx
+                else:
+                    self.vy = -self.vy
+                if blocks.hit(target):
+                    hits.append(target)
+        
+        return hits
+    
+    def _emit(self, events, kind):
+        """Report an effect at the ball position."""
+        if events is not None:
+            events.append((kind, self.x, self.y))
+    
+    def _find_impact(self, dx, dy, paddle, blocks):
+        """Find the earliest wall, paddle or block impact along (dx, dy)."""
+        best = None
+        
+        # Walls
+        if dx < 0 and self.x + dx <= self.radius:
+            best = (max(0.0, (self.radius - self.x) / dx), 1, 0, None)
+        elif dx > 0 and self.x + dx >= self.world_width - self.radius:
+            best = (max(0.0, (self.world_width - self.radius - self.x) / dx), -1, 0, None)
+        if dy < 0 and self.y + dy <= self.radius:
+            t = max(0.0, (self.radius - self.y) / dy)
+            if best is None or t < best[0]:
+                best = (t, 0, 1, None)
+        
+        # Paddle (only while moving down onto it)
+        if dy > 0:
+            impact = sweep_circle_rect(self.x, self.y, dx, dy, self.radius,
+                                       paddle.x, paddle.y,
+                                       paddle.x + paddle.width, paddle.y + paddle.height)
+            if impact is not None and (best is None or impact[0] < best[0]):
+                best = (*impact, paddle)
+        
+        # Blocks in the cells covered by this sub-step
+        if blocks is not None:
+            with Profiler.phase('collision'):
+                best = self._find_block_impact(dx, dy, blocks, best)
+        
+        return best
+    
+    def _find_block_impact(self, dx, dy, blocks, best):
+        """Find the earliest block impact along (dx, dy) if it beats best."""
+        r = self.radius
+        candidates = blocks.query(min(self.x, self.x + dx) - r,
+                                  min(self.y, self.y + dy) - r,
+                                  max(self.x, self.x + dx) + r,
+                                  max(self.y, self.y + dy) + r)
+        if len(candidates):
+            left = blocks.x[candidates]
+            top = blocks.y[candidates]
+            impact = sweep_circle_rects(self.x, self.y, dx, dy, r, left, top,
+                                        left + blocks.width, top + blocks.height)
+            if impact is not None and (best is None or impact[1] < best[0]):
+                i, t, nx, ny = impact
+                best = (t, nx, ny, int(candidates[i]))
+        
+        return best
+    
+    def _bounce_off_paddle(self, paddle):
+        """Set the bounce angle based on where the ball hit the paddle."""
+        hit_pos = min(1.0, max(0.0, (self.x - paddle.x) / paddle.width))
+        angle = math.pi * (0.125 + 0.75 * hit_pos)
+        
+        speed = math.sqrt(self.vx**2 + self.vy**2)
+        self.vx = speed * math.cos(angle)
+        self.vy = -abs(speed * math.sin(angle))
+    
+    def launch(self):
+        """Launch ball from paddle."""
+        self.attached = False
+
+class BallSwarm:
+    """
+    Extra balls for multiball, stored as arrays and moved in one vectorized
+    pass. Trails are kept in a ring buffer of recent positions.
+    """
+    world_width = Config.WINDOW_WIDTH
+    
+    def __init__(self, capacity=None):
+        self.capacity = capacity or Config.MULTIBALL_CAPACITY
+        self.count = 0
+        self.radius = Config.BALL_RADIUS
+        self.color = Colors.BALL
+        self.pos = np.zeros((self.capacity, 2))
+        self.vel = np.zeros((self.capacity, 2))
+        
+        # trail[(head - 1) % length] holds the newest position of every ball
+        self.trail = np.zeros((Config.BALL_TRAIL_LENGTH, self.capacity, 2), dtype=np.float32)
+        self.trail_head = 0
+        self.trail_size = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def spawn(self, x, y, count, rng):
+        """Launch up to count balls from (x, y), fanned out upwards at random angles."""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        angles = np.array([rng.uniform(0.15, 0.85) * math.pi for _ in range(count)])
+        speed = Config.BALL_SPEED * math.sqrt(2)
+        new = slice(self.count, self.count + count)
+        self.pos[new] = (x, y)
+        self.vel[new, 0] = speed * np.cos(angles)
+        self.vel[new, 1] = -speed * np.sin(angles)
+        self.trail[:, new] = (x, y)
+        self.count += count
+    
+    def clear(self):
+        """Remove every ball."""
+        self.count = 0
+        self.trail_size = 0
+    
+    def update(self, dt, paddle, blocks, events=None):
+        """
+        Move every ball, resolving wall, paddle and block hits in time-of-impact
+        order like Ball.update. Balls that fall off the bottom are removed.
+        Returns the indices of blocks hit.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        
+        self.trail[self.trail_head, :n] = self.pos[:n]
+        self.trail_head = (self.trail_head + 1) % len(self.trail)
+        self.trail_size = min(self.trail_size + 1, len(self.trail))
+        
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        remaining = np.full(n, dt)
+        active = np.arange(n)
+        hits = []
+        for _ in range(Config.BALL_MAX_COLLISIONS):
+            if len(active) == 0:
+                break
+            x, y = pos[active, 0], pos[active, 1]
+            dx = vel[active, 0] * remaining[active]
+            dy = vel[active, 1] * remaining[active]
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t, nx, ny, target = self._find_impacts(x, y, dx, dy, paddle, blocks)
+            
+            hit = t <= 1
+            step = np.where(hit, t, 1.0)
+            pos[active, 0] = x + dx * step
+            pos[active, 1] = y + dy * step
+            remaining[active] *= np.where(hit, 1 - t, 0.0)
+            
+            # Walls and blocks reflect; the paddle sets the angle (target -2)
+            flip_x = hit & (nx != 0) & (target != -2)
+            flip_y = hit & (ny != 0) & (target != -2)
+            vel[active[flip_x], 0] *= -1
+            vel[active[flip_y], 1] *= -1
+            on_paddle = active[target == -2]
+            if len(on_paddle):
+                self._bounce_off_paddle(on_paddle, paddle)
+            
+            if events is not None:
+                for i in active[hit & (target < 0)]:
+                    events.append(('spark', float(pos[i, 0]), float(pos[i, 1])))
+            for i in target[target >= 0]:
+                if blocks.hit(i):
+                    hits.append(int(i))
+            
+            active = active[hit & (remaining[active] > 0)]
+        
+        # Drop balls that left through the bottom, keeping the rest packed
+        keep = pos[:, 1] <= Config.WINDOW_HEIGHT
+        if not keep.all():
+            self.count = int(keep.sum())
+            self.pos[:self.count] = pos[keep]
+            self.vel[:self.count] = vel[keep]
+            self.trail[:, :self.count] = self.trail[:, :n][:, keep]
+        
+        return hits
+    
+    def _find_impacts(self, x, y, dx, dy, paddle, blocks):
+        """
+        Find the earliest impact of every ball along (dx, dy).
+        Returns arrays (t, nx, ny, target); t is inf for no hit and target is
+        a block index, -1 for a wall or -2 for the paddle.
+        """
+        r = self.radius
+        n = len(x)
+        t = np.full(n, np.inf)
+        nx = np.zeros(n, dtype=np.int8)
+        ny = np.zeros(n, dtype=np.int8)
+        target = np.full(n, -1, dtype=np.intp)
+        
+        # Walls
+        wall = (dx < 0) & (x + dx <= r)
+        t[wall] = np.maximum(0.0, (r - x[wall]) / dx[wall])
+        nx[wall] = 1
+        wall = (dx > 0) & (x + dx >= self.world_width - r)
+        t[wall] = np.maximum(0.0, (self.world_width - r - x[wall]) / dx[wall])
+        nx[wall] = -1
+        wall = (dy < 0) & (y + dy <= r)
+        t_top = np.where(wall, np.maximum(0.0, (r - y) / dy), np.inf)
+        wall = t_top < t
+        t[wall] = t_top[wall]
+        nx[wall] = 0
+        ny[wall] = 1
+        
+        # Paddle (only while moving down onto it)
+        t_pad, pad_nx, pad_ny = sweep_circles_rects(x, y, dx, dy, r, paddle.x, paddle.y,
+                                                    paddle.x + paddle.width, paddle.y + paddle.height)
+        better = (dy > 0) & (t_pad < t)
+        t[better] = t_pad[better]
+        nx[better] = pad_nx[better]
+        ny[better] = pad_ny[better]
+        target[better] = -2
+        
+        # Blocks in the cells covered by each ball's sub-step
+        if blocks is not None:
+            with Profiler.phase('collision'):
+                owner, index = blocks.query_many(np.minimum(x, x + dx) - r, np.minimum(y, y + dy) - r,
+                                                 np.maximum(x, x + dx) + r, np.maximum(y, y + dy) + r)
+                if len(owner):
+                    left = blocks.x[index]
+                    top = blocks.y[index]
+                    t_block, block_nx, block_ny = sweep_circles_rects(
+                        x[owner], y[owner], dx[owner], dy[owner], r,
+                        left, top, left + blocks.width, top + blocks.height)
+                    
+                    # Earliest block per ball: sort by ball then time, take the first of each
+                    order = np.lexsort((t_block, owner))
+                    owner, first = np.unique(owner[order], return_index=True)
+                    best = order[first]
+                    better = t_block[best] < t[owner]
+                    owner, best = owner[better], best[better]
+                    t[owner] = t_block[best]
+                    nx[owner] = block_nx[best]
+                    ny[owner] = block_ny[best]
+                    target[owner] = index[best]
+        
+        return t, nx, ny, target
+    
+    def _bounce_off_paddle(self, balls, paddle):
+        """Set bounce angles based on where each ball hit the paddle."""
+        hit_pos = np.clip((self.pos[balls, 0] - paddle.x) / paddle.width, 0.0, 1.0)
+        angle = math.pi * (0.125 + 0.75 * hit_pos)
+        speed = np.hypot(self.vel[balls, 0], self.vel[balls, 1])
+        self.vel[balls, 0] = speed * np.cos(angle)
+        self.vel[balls, 1] = -np.abs(speed * np.sin(angle))
+
+def world_width(days, weeks_per_board=None):
+    """
+    Get the playfield width for a calendar of the given length: the window,
+    or wider when a board's weeks don't fit in it.
+    """
+    weeks = min(weeks_per_board or Config.WEEKS_PER_BOARD, days // 7)
+    pitch_x = Config.BLOCK_WIDTH + Config.BLOCK_SPACING
+    return max(Config.WINDOW_WIDTH, weeks * pitch_x + 2 * Config.WORLD_MARGIN)
+
+def board_layout(counts, board, weeks_per_board=None):
+    """
+    Lay out one board of a calendar's daily counts as blocks, centered in the world.
+    Returns the x, y and count arrays of the days with contributions.
+    """
+    weeks_per_board = weeks_per_board or Config.WEEKS_PER_BOARD
+    # Calculate grid dimensions
+    days_in_week = 7
+    total_weeks = len(counts) // days_in_week
+    first_week = board * weeks_per_board
+    weeks = min(weeks_per_board, total_weeks - first_week)
+    first_day = first_week * days_in_week
+    pitch_x = Config.BLOCK_WIDTH + Config.BLOCK_SPACING
+    pitch_y = Config.BLOCK_HEIGHT + Config.BLOCK_SPACING
+    
+    # Starting position
+    start_x = (world_width(len(counts), weeks_per_board) - (weeks * pitch_x)) // 2
+    start_y = 100
+    
+    counts = counts[first_day:first_day + weeks * days_in_week]
+    
+    # Only create blocks for days with contributions
+    days = np.flatnonzero(counts)
+    x = start_x + (days // days_in_week) * pitch_x
+    y = start_y + (days % days_in_week) * pitch_y
+    
+    return x, y, counts[days]
+
+class Simulation:
+    paddle_class = Paddle
+    ball_class = Ball
+    swarm_class = BallSwarm
+    
+    def __init__(self, contributions, seed=None):
+        if not isinstance(contributions, ContributionCalendar):
+            contributions = ContributionCalendar.from_records(contributions)
+        # The calendar the board in play was built from, and the newest one
+        # loaded, which takes over when the board is next rebuilt
+        self.contributions = contributions
+        self.latest_contributions = contributions
+        self.initial_contributions = contributions
+        
+        # Always have a concrete seed so any game can be recorded and replayed
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.dt = 1.0 / Config.PHYSICS_RATE
+        self.tick = 0
+        self.events = []
+        
+        # Packed input for every step() call while recording, else None, and
+        # (step, calendar, complete) for every load_contributions() call
+        self.input_log = None
+        self.load_log = None
+        
+        # Game objects
+        self.world_width = world_width(len(contributions))
+        self.paddle = self.paddle_class(self.world_width // 2 - Config.PADDLE_WIDTH // 2,
+                                        Config.WINDOW_HEIGHT - 100)
+        self.ball = self._new_ball()
+        self.swarm = self.swarm_class()
+        self._resize_world()
+        
+        # Long histories are split into boards of Config.WEEKS_PER_BOARD weeks,
+        # played one after another; only the current board's blocks exist
+        self.board_count = self._count_boards()
+        self.board = 0
+        self.blocks = self._create_blocks()
+        
+        # False while the calendar is still streaming in and may grow
+        self.complete = True
+        
+        # Game state
+        self.score = 0
+        self.lives = 3
+        self.game_over = False
+        self.paused = False
+    
+    def _new_ball(self):
+        """Create a ball resting on the paddle."""
+        ball = self.ball_class(self.paddle.x + self.paddle.width // 2,
+                               self.paddle.y - Config.BALL_RADIUS)
+        ball.world_width = self.world_width
+        return ball
+    
+    def _resize_world(self):
+        """Fit the paddle and balls to the current world width."""
+        width = world_width(len(self.contributions))
+        if width != self.world_width and self.ball.attached:
+            self.paddle.x = width // 2 - self.paddle.width // 2
+        self.world_width = width
+        for body in (self.paddle, self.ball, self.swarm):
+            body.world_width = width
+        self.paddle.x = min(self.paddle.x, width - self.paddle.width)
+    
+    def _count_boards(self):
+        """Get how many boards the newest calendar is split into."""
+        weeks = len(self.latest_contributions) // 7
+        return max(1, -(-weeks // Config.WEEKS_PER_BOARD))
+    
+    def load_contributions(self, contributions, complete=True):
+        """
+        Switch to a newer or longer calendar, such as one still streaming in.
+        With complete=False more days may follow, so clearing the last board
+        waits for them instead of ending the game. The board in play is only
+        rebuilt while none of its blocks have been hit and the ball is on the
+        paddle, so blocks never change under a moving ball. Otherwise the new
+        calendar takes over at the next board, and until then contributions
+        stays the calendar the board in play was built from.
+        """
+        if self.load_log is not None:
+            self.load_log.append((len(self.input_log), contributions, complete))
+        self.latest_contributions = contributions
+        self.complete = complete
+        self.board_count = self._count_boards()
+        if len(self.blocks) == 0 or (self.ball.attached and self.blocks.alive_count == len(self.blocks)):
+            self._adopt_contributions()
+            self.blocks = self._create_blocks()
+    
+    def _adopt_contributions(self):
+        """Make the newest calendar the one boards are built from."""
+        self.contributions = self.latest_contributions
+        self._resize_world()
+    
+    def _create_blocks(self):
+        """Create the block store for the current board from GitHub contributions."""
+        return BlockStore(*board_layout(self.contributions.counts, self.board))
+    
+    def step(self, inputs):
+        """Advance the simulation by one fixed tick."""
+        self.events = []
+        if self.input_log is not None:
+            self.input_log.append(inputs.encode())
+        
+        if inputs.pause:
+            self.paused = not self.paused
+        
+        if self.paused or self.game_over:
+            return
+        
+        self.tick += 1
+        dt = self.dt
+        
+        if inputs.launch and self.ball.attached:
+            self.ball.launch()
+        if inputs.multiball and not self.ball.attached:
+            self.swarm.spawn(self.ball.x, self.ball.y, Config.MULTIBALL_COUNT, self.rng)
+        
+        # Update game objects
+        self.paddle.update(dt, inputs)
+        hits = self.ball.update(dt, self.paddle, self.blocks, self.events)
+        if self.swarm.count:
+            hits.extend(self.swarm.update(dt, self.paddle, self.blocks, self.events))
+        
+        # Update blocks that are still animating
+        self.blocks.update(dt)
+        
+        # Score blocks hit during this tick
+        palette = Colors.contribution_palette()
+        for i in hits:
+            self.score += self.blocks.score(i)
+            self.events.append(('explosion', float(self.blocks.x[i]) + self.blocks.width // 2,
+                                float(self.blocks.y[i]) + self.blocks.height // 2,
+                                palette[self.blocks.levels[i]]))
+        
+        # Check if ball is out of bounds
+        if self.ball.y > Config.WINDOW_HEIGHT:
+            self.lives -= 1
+            if self.lives <= 0:
+                self.game_over = True
+            else:
+                # Reset ball
+                self.ball = self._new_ball()
+        
+        # Check win condition
+        if self.blocks.alive_count == 0:
+            if self.board + 1 < self.board_count:
+                self._next_board()
+            elif self.complete:
+                self.game_over = True
+    
+    def _next_board(self):
+        """Move on to the next board with the ball back on the paddle."""
+        self.board += 1
+        self._adopt_contributions()
+        self.blocks = self._create_blocks()
+        self.ball = self._new_ball()
+        self.swarm.clear()
+        self.events.append(('board', self.board))
+
+IDLE_INPUT = InputState()
+
+def run_headless(simulation, ticks, policy=None):
+    """
+    Step a simulation as fast as possible.
+    policy(simulation) returns the InputState for each tick; None means no input.
+    Stops early when the game is over. Returns the number of ticks run.
+    """
+    for i in range(ticks):
+        if simulation.game_over:
+            return i
+        inputs = policy(simulation) if policy is not None else IDLE_INPUT
+        simulation.step(inputs)
+    return ticks
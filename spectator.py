@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Spectator server for showing live games on other screens.
+
+Clients connect over TCP and get a keyframe with the calendar and a
+destroyed-block bitset, then small binary deltas: paddle and ball positions,
+score, lives and the indices of blocks destroyed since the last update. Every
+message is encoded once and the same bytes go to every client.
+
+Usage:
+    python spectator.py serve [--port 8765] [--seed 0]     # headless auto-played game
+    python spectator.py watch [--host 127.0.0.1] [--port 8765]
+    python spectator.py selftest [--clients 200] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import struct
+import threading
+import time
+import numpy as np
+from datetime import date
+from config import Config
+from contributions import ContributionCalendar
+from simulation import board_layout
+from utils.blockstore import BlockStore
+
+# Every message: payload length, message type
+HEADER = struct.Struct('<IB')
+KEYFRAME = 1
+DELTA = 2
+
+# Keyframe: tick, calendar start (proleptic ordinal), days, board, weeks per
+# board; then STATE, balls, one uint16 count per day and the alive bitset of
+# the board's blocks
+KEYFRAME_INFO = struct.Struct('<IIIHH')
+# Delta: tick; then STATE, balls and uint16 count + indices of destroyed blocks
+DELTA_INFO = struct.Struct('<I')
+# Score, lives, flags, paddle x, ball x and y
+STATE = struct.Struct('<IbBfff')
+COUNT = struct.Struct('<H')
+
+FLAG_PAUSED = 1
+FLAG_GAME_OVER = 2
+FLAG_ATTACHED = 4
+
+def _encode_state(simulation):
+    """Encode the per-update state shared by keyframes and deltas."""
+    flags = ((FLAG_PAUSED if simulation.paused else 0) |
+             (FLAG_GAME_OVER if simulation.game_over else 0) |
+             (FLAG_ATTACHED if simulation.ball.attached else 0))
+    swarm = simulation.swarm
+    balls = swarm.pos[:swarm.count].astype('<i2').tobytes()
+    return (STATE.pack(simulation.score, simulation.lives, flags, simulation.paddle.x,
+                       simulation.ball.x, simulation.ball.y) +
+            COUNT.pack(swarm.count) + balls)
+
+def _message(kind, payload):
+    return HEADER.pack(len(payload), kind) + payload
+
+class SnapshotEncoder:
+    """Turns a simulation into keyframes and deltas against the last update."""
+    def __init__(self):
+        self.blocks = None
+        self.sent_alive = None
+    
+    def keyframe(self, simulation):
+        """Encode the full state."""
+        calendar = simulation.contributions
+        blocks = simulation.blocks
+        payload = (KEYFRAME_INFO.pack(simulation.tick, calendar.start.toordinal(), len(calendar),
+                                      simulation.board, Config.WEEKS_PER_BOARD) +
+                   _encode_state(simulation) +
+                   calendar.counts.astype('<u2', copy=False).tobytes() +
+                   np.packbits(blocks.alive, bitorder='little').tobytes())
+        return _message(KEYFRAME, payload)
+    
+    def delta(self, simulation):
+        """
+        Encode what changed since the last call, or None when the board itself
+        changed and only a keyframe can describe it.
+        """
+        blocks = simulation.blocks
+        if blocks is not self.blocks:
+            self.blocks = blocks
+            self.sent_alive = blocks.alive.copy()
+            return None
+        destroyed = np.flatnonzero(self.sent_alive & ~blocks.alive)
+        self.sent_alive[destroyed] = False
+        payload = (DELTA_INFO.pack(simulation.tick) + _encode_state(simulation) +
+                   COUNT.pack(len(destroyed)) + destroyed.astype('<u2').tobytes())
+        return _message(DELTA, payload)
+
+class SpectatorServer:
+    """
+    Broadcasts a simulation to TCP clients from an asyncio loop on a daemon thread.
+    The game loop calls publish(); encoding happens there, once for all clients.
+    """
+    def __init__(self, host=None, port=None):
+        self.host = host or Config.SPECTATOR_HOST
+        self.port = Config.SPECTATOR_PORT if port is None else port
+        self.encoder = SnapshotEncoder()
+        self.clients = {}
+        self.keyframe_wanted = False
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.last_publish = 0
+    
+    def start(self):
+        """
+        Start listening; returns once the port is bound. Raises OSError if it
+        can't be bound.
+        """
+        ready = threading.Event()
+        failure = []
+        
+        def run():
+            loop = asyncio.new_event_loop()
+            try:
+                self.server = loop.run_until_complete(
+                    asyncio.start_server(self._connected, self.host, self.port))
+                self.port = self.server.sockets[0].getsockname()[1]
+                self.loop = loop
+            except Exception as e:
+                failure.append(e)
+                loop.close()
+                return
+            finally:
+                ready.set()
+            loop.run_forever()
+        
+        self.thread = threading.Thread(target=run, name='spectator-server', daemon=True)
+        self.thread.start()
+        ready.wait()
+        if failure:
+            self.thread.join()
+            raise failure[0]
+        return self
+    
+    def stop(self):
+        """Disconnect every client and stop the server."""
+        if self.loop is None:
+            return
+        
+        async def close():
+            self.server.close()
+            for writer in list(self.clients):
+                writer.close()
+            await self.server.wait_closed()
+        
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+    
+    def publish(self, simulation, force=False):
+        """
+        Send the simulation's state to every client, at most Config.SPECTATOR_RATE
+        times a second unless forced.
+        """
+        now = time.perf_counter()
+        if not force and now - self.last_publish < 1.0 / Config.SPECTATOR_RATE:
+            return
+        self.last_publish = now
+        
+        delta = self.encoder.delta(simulation)
+        keyframe = None
+        if delta is None or self.keyframe_wanted:
+            self.keyframe_wanted = False
+            keyframe = self.encoder.keyframe(simulation)
+        self.loop.call_soon_threadsafe(self._broadcast, delta, keyframe)
+    
+    async def _connected(self, reader, writer):
+        # New clients wait for the next keyframe; the game loop encodes it
+        self.clients[writer] = 'keyframe'
+        self.keyframe_wanted = True
+        try:
+            # Spectators don't send anything; reading just notices the disconnect
+            await reader.read()
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+    
+    def _broadcast(self, delta, keyframe):
+        for writer, state in list(self.clients.items()):
+            if writer.is_closing():
+                continue
+            buffered = writer.transport.get_write_buffer_size()
+            if state == 'lagging':
+                # Skipped deltas can't be replayed; resync once the backlog drains
+                if buffered < Config.SPECTATOR_BUFFER_LIMIT // 2:
+                    self.clients[writer] = state = 'keyframe'
+                    self.keyframe_wanted = True
+                continue
+            if state == 'keyframe' or delta is None:
+                if keyframe is None:
+                    continue
+                writer.write(keyframe)
+                self.clients[writer] = 'live'
+            else:
+                writer.write(delta)
+            if writer.transport.get_write_buffer_size() > Config.SPECTATOR_BUFFER_LIMIT:
+                self.clients[writer] = 'lagging'
+
+class SpectatorView:
+    """A client-side copy of the game rebuilt from keyframes and deltas."""
+    def __init__(self):
+        self.tick = 0
+        self.calendar = None
+        self.board = 0
+        self.weeks_per_board = Config.WEEKS_PER_BOARD
+        self.blocks = None
+        self.score = 0
+        self.lives = 0
+        self.flags = 0
+        self.paddle_x = 0.0
+        self.ball = (0.0, 0.0)
+        self.balls = np.empty((0, 2), dtype=np.int16)
+        self.keyframes = 0
+        self.deltas = 0
+    
+    def apply(self, kind, payload):
+        """Update the view from one message."""
+        if kind == KEYFRAME:
+            self.tick, start, days, self.board, self.weeks_per_board = \
+                KEYFRAME_INFO.unpack_from(payload)
+            offset = self._read_state(payload, KEYFRAME_INFO.size)
+            counts = np.frombuffer(payload, dtype='<u2', count=days, offset=offset)
+            offset += days * 2
+            self.calendar = ContributionCalendar(date.fromordinal(start), counts.copy())
+            self.blocks = BlockStore(*board_layout(self.calendar.counts, self.board,
+                                                   self.weeks_per_board))
+            alive = np.unpackbits(np.frombuffer(payload, dtype=np.uint8, offset=offset),
+                                  count=len(self.blocks), bitorder='little').astype(bool)
+            for i in np.flatnonzero(~alive):
+                self.blocks.hit(i)
+            self.keyframes += 1
+        elif kind == DELTA and self.blocks is not None:
+            self.tick, = DELTA_INFO.unpack_from(payload)
+            offset = self._read_state(payload, DELTA_INFO.size)
+            count, = COUNT.unpack_from(payload, offset)
+            for i in np.frombuffer(payload, dtype='<u2', count=count, offset=offset + COUNT.size):
+                self.blocks.hit(int(i))
+            self.deltas += 1
+    
+    def _read_state(self, payload, offset):
+        self.score, self.lives, self.flags, self.paddle_x, ball_x, ball_y = \
+            STATE.unpack_from(payload, offset)
+        self.ball = (ball_x, ball_y)
+        offset += STATE.size
+        count, = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        self.balls = np.frombuffer(payload, dtype='<i2', count=count * 2, offset=offset).reshape(-1, 2)
+        return offset + count * 4
+    
+    @property
+    def game_over(self):
+        return bool(self.flags & FLAG_GAME_OVER)
+
+class SpectatorClient:
+    """Reference headless client: keeps a SpectatorView in sync with a server."""
+    def __init__(self, host=None, port=None):
+        self.host = host or Config.SPECTATOR_HOST
+        self.port = Config.SPECTATOR_PORT if port is None else port
+        self.view = SpectatorView()
+        self.received = 0
+    
+    async def run(self, on_update=None):
+        """Follow the game until the server disconnects. on_update(view) runs after each message."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                    length, kind = HEADER.unpack(header)
+                    payload = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    return self.view
+                self.received += HEADER.size + length
+                self.view.apply(kind, payload)
+                if on_update is not None:
+                    on_update(self.view)
+        finally:
+            writer.close()
+
+def _auto_play(seed, years, seconds, server):
+    """Play a headless auto-played game in real time, publishing to the server."""
+    from batch import predict_landing
+    from contributions import generate_mock_calendars
+    from simulation import Simulation
+    
+    simulation = Simulation(generate_mock_calendars(1, years * 365, seed=seed)[0], seed)
+    start = time.perf_counter()
+    while seconds is None or time.perf_counter() - start < seconds:
+        due = int((time.perf_counter() - start) * Config.PHYSICS_RATE)
+        while simulation.tick < due and not simulation.game_over:
+            simulation.step(predict_landing(simulation))
+        server.publish(simulation)
+        time.sleep(1.0 / Config.SPECTATOR_RATE / 2)
+    server.publish(simulation, force=True)
+    return simulation
+
+def selftest(clients, seconds, seed):
+    """Run an auto-played game with many loopback clients and check their boards match."""
+    server = SpectatorServer('127.0.0.1', 0).start()
+    followers = [SpectatorClient('127.0.0.1', server.port) for _ in range(clients)]
+    results = {}
+    
+    def play():
+        # Give every client time to connect before the game starts
+        time.sleep(0.5)
+        results['simulation'] = _auto_play(seed, 1, seconds, server)
+        time.sleep(0.5)
+        server.stop()
+    
+    thread = threading.Thread(target=play)
+    thread.start()
+    
+    async def follow():
+        return await asyncio.gather(*(client.run() for client in followers))
+    
+    views = asyncio.run(follow())
+    thread.join()
+    
+    simulation = results['simulation']
+    synced = sum(view.tick == simulation.tick and view.score == simulation.score and
+                 view.lives == simulation.lives and
+                 np.array_equal(view.blocks.alive, simulation.blocks.alive) for view in views)
+    received = [client.received for client in followers]
+    print(f"{synced}/{clients} clients in sync after {simulation.tick} ticks "
+          f"(score {simulation.score}, {simulation.blocks.alive_count} blocks left)")
+    print(f"Per client: {np.mean(received) / seconds / 1024:.1f} KiB/s, "
+          f"{np.mean([view.keyframes for view in views]):.1f} keyframes, "
+          f"{np.mean([view.deltas for view in views]):.0f} deltas")
+    return synced == clients
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadcast or watch live games.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="serve a headless auto-played game")
+    serve.add_argument('--host')
+    serve.add_argument('--port', type=int)
+    serve.add_argument('--seed', type=int, default=0)
+    serve.add_argument('--years', type=int, default=1)
+    watch = commands.add_parser('watch', help="follow a game and print its state")
+    watch.add_argument('--host')
+    watch.add_argument('--port', type=int)
+    test = commands.add_parser('selftest', help="check many loopback clients stay in sync")
+    test.add_argument('--clients', type=int, default=200)
+    test.add_argument('--seconds', type=float, default=5)
+    test.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    if args.command == 'serve':
+        server = SpectatorServer(args.host, args.port).start()
+        print(f"Serving spectators on {server.host}:{server.port}")
+        try:
+            _auto_play(args.seed, args.years, None, server)
+        except KeyboardInterrupt:
+            server.stop()
+    elif args.command == 'watch':
+        def show(view):
+            if view.tick % Config.PHYSICS_RATE < 4:
+                print(f"tick {view.tick}: score {view.score}, lives {view.lives}, "
+                      f"{view.blocks.alive_count} blocks left, ball at {view.ball[0]:.0f},{view.ball[1]:.0f}")
+        asyncio.run(SpectatorClient(args.host, args.port).run(show))
+    elif not selftest(args.clients, args.seconds, args.seed):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Array-backed storage for contribution blocks
+"""
+
+import numpy as np
+from config import Config
+
+# Upper bounds of contribution levels 0-3; anything above is level 4
+LEVEL_BOUNDS = [1, 4, 7, 10]
+
+def contribution_levels(counts):
+    """Map contribution counts to color levels 0 (none) to 4 (max)."""
+    return np.digitize(counts, LEVEL_BOUNDS).astype(np.uint8)
+
+class BlockStore:
+    def __init__(self, x, y, counts):
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.uint16)
+        self.levels = contribution_levels(self.counts)
+        self.alive = np.ones(len(self.counts), dtype=bool)
+        self.anim = np.zeros(len(self.counts), dtype=np.float32)
+        self.width = Config.BLOCK_WIDTH
+        self.height = Config.BLOCK_HEIGHT
+        self.alive_count = len(self.counts)
+        self.animating = np.empty(0, dtype=np.intp)
+
+        # Blocks sit on a regular lattice; a dense cell -> index table (-1 when
+        # empty) finds the blocks near a box, or near many boxes at once
+        self.pitch_x = Config.BLOCK_WIDTH + Config.BLOCK_SPACING
+        self.pitch_y = Config.BLOCK_HEIGHT + Config.BLOCK_SPACING
+        if len(self.counts):
+            self.origin = (float(self.x.min()), float(self.y.min()))
+            cols = np.round((self.x - self.origin[0]) / self.pitch_x).astype(np.intp)
+            rows = np.round((self.y - self.origin[1]) / self.pitch_y).astype(np.intp)
+            self.cells = np.full((rows.max() + 1, cols.max() + 1), -1, dtype=np.intp)
+            self.cells[rows, cols] = np.arange(len(self.counts))
+        else:
+            self.origin = (0.0, 0.0)
+            self.cells = np.full((0, 0), -1, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def query(self, x0, y0, x1, y1):
+        """Get indices of alive blocks near the given bounding box."""
+        _, index = self.query_many(np.array([x0]), np.array([y0]), np.array([x1]), np.array([y1]))
+        return index
+
+    def query_many(self, x0, y0, x1, y1):
+        """
+        Find alive blocks near many bounding boxes at once.
+        Takes arrays of box edges and returns (owner, index) arrays pairing
+        each box with the blocks whose cells it touches.
+        """
+        rows, cols = self.cells.shape
+        if rows == 0 or len(x0) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        c0 = np.floor((x0 - self.origin[0]) / self.pitch_x).astype(np.intp)
+        c1 = np.floor((x1 - self.origin[0]) / self.pitch_x).astype(np.intp)
+        r0 = np.floor((y0 - self.origin[1]) / self.pitch_y).astype(np.intp)
+        r1 = np.floor((y1 - self.origin[1]) / self.pitch_y).astype(np.intp)
+
+        # Skip boxes entirely outside the lattice, then visit every box's cells
+        # as one (boxes, span_rows, span_cols) array
+        inside = np.flatnonzero((c1 >= 0) & (c0 < cols) & (r1 >= 0) & (r0 < rows))
+        if len(inside) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        c0, c1, r0, r1 = c0[inside], c1[inside], r0[inside], r1[inside]
+        span_c = int((c1 - c0).max()) + 1
+        span_r = int((r1 - r0).max()) + 1
+        c = c0[:, None, None] + np.arange(span_c)[None, None, :]
+        r = r0[:, None, None] + np.arange(span_r)[None, :, None]
+        valid = (c <= c1[:, None, None]) & (r <= r1[:, None, None]) & \
+                (c >= 0) & (c < cols) & (r >= 0) & (r < rows)
+        index = np.where(valid, self.cells[np.clip(r, 0, rows - 1), np.clip(c, 0, cols - 1)], -1)
+
+        owner = np.broadcast_to(inside[:, None, None], index.shape)
+        found = index >= 0
+        owner, index = owner[found], index[found]
+        alive = self.alive[index]
+        return owner[alive], index[alive]
+
+    def hit(self, i):
+        """Destroy block i and start its animation. Returns False if already gone."""
+        if not self.alive[i]:
+            return False
+        self.alive[i] = False
+        self.anim[i] = 1.0
+        self.animating = np.append(self.animating, i)
+        self.alive_count -= 1
+        return True
+
+    def update(self, dt):
+        """Advance the destroy animations still playing, all at once."""
+        if len(self.animating) == 0:
+            return
+        anim = self.anim[self.animating] - dt * 3
+        self.anim[self.animating] = np.maximum(anim, 0)
+        self.animating = self.animating[anim > 0]
+
+    def score(self, i):
+        """Get points for destroying block i."""
+        return int(self.counts[i]) * 10
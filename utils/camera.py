@@ -0,0 +1,26 @@
+"""
+Scrolling camera for playfields wider than the window
+"""
+
+from config import Config
+
+class Camera:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.x = 0.0
+    
+    @property
+    def offset(self):
+        """Get the world x shown at the left edge of the screen, in whole pixels."""
+        return int(round(self.x))
+    
+    def follow(self, target_x, world_width, dt):
+        """Ease the view towards centering target_x, never showing past the world's edges."""
+        goal = target_x - self.width / 2
+        self.x += (goal - self.x) * min(1.0, dt * Config.CAMERA_FOLLOW_SPEED)
+        self.x = max(0.0, min(self.x, world_width - self.width))
+    
+    def visible(self, margin=0):
+        """Get the world x range on screen, widened by margin on both sides."""
+        return self.offset - margin, self.offset + self.width + margin
@@ -2,6 +2,9 @@
 Color schemes for the game
 """
 
+import math
+from config import Config
+
 class Colors:
     # GitHub contribution colors (dark mode)
     CONTRIB_NONE = (22, 27, 34)      # #161b22
@@ -18,9 +21,16 @@ class Colors:
     TEXT_SECONDARY = (139, 148, 158) # #8b949e
     GRID_LINE = (48, 54, 61)         # #30363d
     
+    # Bumped on every theme change so caches can tell stale surfaces apart
+    theme_version = 0
+    
+    # Block sprite atlases keyed by palette, so flipping back and forth is free
+    atlases = {}
+    
     @classmethod
     def update_theme(cls, dark_mode):
         """Update colors based on theme."""
+        cls.theme_version += 1
         if dark_mode:
             # Dark mode (default)
             cls.CONTRIB_NONE = (22, 27, 34)
@@ -48,4 +58,68 @@ class Colors:
             cls.BALL = (36, 41, 47)
             cls.TEXT = (36, 41, 47)
             cls.TEXT_SECONDARY = (106, 115, 125)
-            cls.GRID_LINE = (234, 236, 239)
\ No newline at end of file
+            cls.GRID_LINE = (234, 236, 239)
+    
+    @classmethod
+    def contribution_palette(cls):
+        """Get contribution colors indexed by level (0 = none, 4 = max)."""
+        return (cls.CONTRIB_NONE, cls.CONTRIB_LOW, cls.CONTRIB_MEDIUM,
+                cls.CONTRIB_HIGH, cls.CONTRIB_MAX)
+    
+    @classmethod
+    def block_atlas(cls):
+        """Get the block sprite atlas for the current theme, building it on first use."""
+        palette = cls.contribution_palette()
+        atlas = cls.atlases.get(palette)
+        if atlas is None:
+            atlas = cls.atlases[palette] = BlockAtlas(palette)
+        return atlas
+
+class BlockAtlas:
+    """
+    Pre-rendered blocks for every contribution level on one surface.
+    Row n holds level n: the intact block with its highlight, then the
+    destroy animation from almost full size down to the smallest frame.
+    """
+    def __init__(self, palette):
+        import pygame
+        
+        width, height = Config.BLOCK_WIDTH, Config.BLOCK_HEIGHT
+        frames = Config.BLOCK_ANIMATION_FRAMES
+        self.frames = frames
+        self.surface = pygame.Surface((width * (frames + 1), height * len(palette)), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        
+        # areas[level][0] is the intact block, areas[level][k] the animation frame
+        # for scales in ((k - 1) / frames, k / frames]
+        self.areas = []
+        for level, color in enumerate(palette):
+            y = level * height
+            cell = pygame.Rect(0, y, width, height)
+            pygame.draw.rect(self.surface, color, cell, border_radius=Config.BLOCK_RADIUS)
+            
+            # Subtle gradient: the top half lightened towards white
+            highlight = tuple(c + (255 - c) * 30 // 255 for c in color)
+            pygame.draw.rect(self.surface, highlight, (1, y + 1, width - 2, height // 2),
+                             border_top_left_radius=Config.BLOCK_RADIUS - 1,
+                             border_top_right_radius=Config.BLOCK_RADIUS - 1)
+            areas = [cell]
+            
+            for k in range(1, frames + 1):
+                x = k * width
+                w = int(width * k / frames)
+                h = int(height * k / frames)
+                pygame.draw.rect(self.surface, color,
+                                 (x + (width - w) // 2, y + (height - h) // 2, w, h),
+                                 border_radius=Config.BLOCK_RADIUS)
+                areas.append(pygame.Rect(x, y, width, height))
+            self.areas.append(areas)
+    
+    def block(self, level):
+        """Get the atlas area of an intact block."""
+        return self.areas[level][0]
+    
+    def frame(self, level, scale):
+        """Get the atlas area of the destroy animation frame for a scale in (0, 1]."""
+        return self.areas[level][max(1, min(self.frames, math.ceil(scale * self.frames)))]
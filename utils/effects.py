@@ -3,74 +3,148 @@ Visual effects for the game
 """
 
 import pygame
-import random
-import math
-
-class Particle:
-    def __init__(self, x, y, vx, vy, color, lifetime):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.color = color
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.size = random.randint(2, 4)
-        
+import numpy as np
+from config import Config
+
+GRAVITY = 200
+ALPHA_BUCKETS = 16
+MAX_PARTICLE_SIZE = 4
+
+class ParticlePool:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.prev = np.zeros((capacity, 2), dtype=np.float32)  # Positions before the last update
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.max_lifetime = np.ones(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.uint8)
+        self.color = np.zeros(capacity, dtype=np.uint16)
+
+    def spawn(self, rng, x, y, n, speed_range, lifetime_range, color):
+        """Add up to n particles bursting from (x, y); extra ones are dropped when full."""
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return
+        s = slice(self.count, self.count + n)
+        angle = rng.uniform(0, 2 * np.pi, n)
+        speed = rng.uniform(*speed_range, n)
+        self.pos[s] = (x, y)
+        self.prev[s] = (x, y)
+        self.vel[s, 0] = np.cos(angle) * speed
+        self.vel[s, 1] = np.sin(angle) * speed
+        self.lifetime[s] = rng.uniform(*lifetime_range, n)
+        self.max_lifetime[s] = self.lifetime[s]
+        self.size[s] = rng.integers(2, MAX_PARTICLE_SIZE + 1, n)
+        self.color[s] = color
+        self.count += n
+
     def update(self, dt):
-        """Update particle position and lifetime."""
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-        self.vy += 200 * dt  # Gravity
-        self.lifetime -= dt
-        
-    def draw(self, screen):
-        """Draw particle with fading effect."""
-        if self.lifetime > 0:
-            alpha = self.lifetime / self.max_lifetime
-            size = int(self.size * alpha)
-            if size > 0:
-                # Create a surface for the particle with alpha
-                particle_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                color_with_alpha = (*self.color, int(255 * alpha))
-                pygame.draw.circle(particle_surface, color_with_alpha, (size, size), size)
-                screen.blit(particle_surface, (int(self.x - size), int(self.y - size)))
+        """Integrate live particles and compact out the expired ones."""
+        n = self.count
+        if n == 0:
+            return
+        self.prev[:n] = self.pos[:n]
+        self.pos[:n] += self.vel[:n] * dt
+        self.vel[:n, 1] += GRAVITY * dt  # Gravity
+        self.lifetime[:n] -= dt
+
+        live = self.lifetime[:n] > 0
+        k = int(np.count_nonzero(live))
+        if k < n:
+            for array in (self.pos, self.prev, self.vel, self.lifetime, self.max_lifetime,
+                          self.size, self.color):
+                array[:k] = array[:n][live]
+            self.count = k
+
+    def clear(self):
+        """Remove all particles."""
+        self.count = 0
 
 class Effects:
-    particles = []
-    
+    pool = ParticlePool(Config.MAX_PARTICLES)
+    rng = np.random.default_rng()
+    colors = []
+    color_ids = {}
+    sprites = {}
+
+    @classmethod
+    def seed(cls, seed):
+        """Seed the particle RNG so effects are reproducible."""
+        cls.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def _color_id(cls, color):
+        """Get the palette slot for a color, adding it if new."""
+        color = tuple(color)
+        if color not in cls.color_ids:
+            cls.color_ids[color] = len(cls.colors)
+            cls.colors.append(color)
+        return cls.color_ids[color]
+
+    @classmethod
+    def _sprite(cls, color_id, size, alpha_bucket):
+        """Get a pre-rendered alpha circle for a particle."""
+        key = (color_id, size, alpha_bucket)
+        sprite = cls.sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            alpha = 255 * alpha_bucket // (ALPHA_BUCKETS - 1)
+            pygame.draw.circle(sprite, (*cls.colors[color_id], alpha), (size, size), size)
+            cls.sprites[key] = sprite
+        return sprite
+
+    @classmethod
+    def prewarm(cls, colors):
+        """Render every particle sprite for the given colors ahead of time."""
+        for color in colors:
+            color_id = cls._color_id(color)
+            for size in range(1, MAX_PARTICLE_SIZE + 1):
+                for alpha_bucket in range(ALPHA_BUCKETS):
+                    cls._sprite(color_id, size, alpha_bucket)
+
     @classmethod
     def create_spark(cls, x, y):
         """Create spark effect at position."""
-        for _ in range(5):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(50, 150)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            color = (255, 255, 255)
-            lifetime = random.uniform(0.2, 0.4)
-            cls.particles.append(Particle(x, y, vx, vy, color, lifetime))
-    
+        cls.pool.spawn(cls.rng, x, y, 5, (50, 150), (0.2, 0.4),
+                       cls._color_id((255, 255, 255)))
+
     @classmethod
     def create_explosion(cls, x, y, color):
         """Create explosion effect with given color."""
-        for _ in range(15):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(100, 300)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            lifetime = random.uniform(0.3, 0.6)
-            cls.particles.append(Particle(x, y, vx, vy, color, lifetime))
-    
+        cls.pool.spawn(cls.rng, x, y, 15, (100, 300), (0.3, 0.6), cls._color_id(color))
+
     @classmethod
     def update(cls, dt):
-        """Update all particles."""
-        cls.particles = [p for p in cls.particles if p.lifetime > 0]
-        for particle in cls.particles:
-            particle.update(dt)
-    
+        """Update all particles by one fixed step."""
+        cls.pool.update(dt)
+
     @classmethod
-    def draw(cls, screen):
-        """Draw all particles."""
-        for particle in cls.particles:
-            particle.draw(screen)
\ No newline at end of file
+    def draw(cls, screen, offset=0, alpha=1.0):
+        """
+        Draw the particles on screen with fading effect, offset world x to the
+        left. alpha (0-1) places them between their previous and current
+        positions. Returns the areas drawn.
+        """
+        pool = cls.pool
+        n = pool.count
+        if n == 0:
+            return []
+
+        fade = np.clip(pool.lifetime[:n] / pool.max_lifetime[:n], 0, 1)
+        sizes = (pool.size[:n] * fade).astype(np.int32)
+        buckets = (fade * (ALPHA_BUCKETS - 1)).round().astype(np.int32)
+        pos = pool.pos[:n]
+        if alpha < 1.0:
+            pos = pool.prev[:n] + (pos - pool.prev[:n]) * alpha
+        x = pos[:, 0] - offset
+        shown = np.flatnonzero((sizes > 0) & (x > -MAX_PARTICLE_SIZE) &
+                               (x < screen.get_width() + MAX_PARTICLE_SIZE))
+        left = (x[shown] - sizes[shown]).astype(np.int32)
+        top = (pos[shown, 1] - sizes[shown]).astype(np.int32)
+
+        sequence = [(cls._sprite(c, s, b), (x, y))
+                    for c, s, b, x, y in zip(pool.color[shown].tolist(), sizes[shown].tolist(),
+                                             buckets[shown].tolist(), left.tolist(), top.tolist())]
+        return screen.blits(sequence)
@@ -0,0 +1,74 @@
+"""
+Frame pacing: a precise frame timer and dropped-frame accounting
+"""
+
+import os
+import time
+from config import Config
+
+class FramePacer:
+    """
+    Waits out each frame to a fixed rate. Most of the wait is a normal sleep;
+    only the last Config.FRAME_SPIN_TIME is spent polling the clock, which is
+    what makes the deadline precise without busy-waiting the whole frame.
+    """
+    def __init__(self, rate):
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.deadline = None
+        self.last = None
+        self.frames = 0
+        self.dropped = 0
+        self.late = 0.0
+    
+    def tick(self):
+        """Wait for the next frame. Returns the seconds since the previous one."""
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.last = now
+            self.deadline = now + self.period
+            return 0.0
+        
+        remaining = self.deadline - now
+        if remaining > Config.FRAME_SPIN_TIME:
+            time.sleep(remaining - Config.FRAME_SPIN_TIME)
+        while time.perf_counter() < self.deadline:
+            # Let other threads (loader, spectators) run while spinning
+            time.sleep(0)
+        now = time.perf_counter()
+        
+        # A frame that overran its slot shows up as one or more missed refreshes;
+        # start the next slot from now rather than rushing to catch up
+        overrun = now - self.deadline
+        if overrun >= self.period:
+            self.dropped += int(overrun / self.period)
+            self.deadline = now + self.period
+        else:
+            self.deadline += self.period
+        self.late = max(self.late, overrun)
+        
+        dt = now - self.last
+        self.last = now
+        self.frames += 1
+        return dt
+    
+    def report(self):
+        """Format the frame count, dropped frames and worst lateness as one line."""
+        total = self.frames + self.dropped
+        share = 100 * self.dropped / total if total else 0
+        return (f"Frames: {self.frames} at {self.rate} Hz, {self.dropped} dropped ({share:.1f}%), "
+                f"worst {self.late * 1000:.1f} ms late")
+
+def display_rate():
+    """Get the refresh rate to render at: FPS from the environment, the display's, or Config.FPS."""
+    import pygame
+    
+    if os.getenv('FPS'):
+        return int(os.getenv('FPS'))
+    # Only some pygame builds can report the refresh rate
+    get_rates = getattr(pygame.display, 'get_desktop_refresh_rates', None)
+    if get_rates is not None:
+        rates = [rate for rate in get_rates() if rate > 0]
+        if rates:
+            return rates[0]
+    return Config.FPS
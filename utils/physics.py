@@ -0,0 +1,119 @@
+"""
+Continuous collision helpers for the ball
+"""
+
+import numpy as np
+
+def sweep_circle_rect(x, y, dx, dy, radius, left, top, right, bottom):
+    """
+    Find when a circle moving by (dx, dy) first touches a rectangle.
+    Returns (t, nx, ny) with t in [0, 1] and the surface normal, or None.
+    The rectangle is expanded by the radius and tested with a ray (slab method).
+    """
+    left -= radius
+    top -= radius
+    right += radius
+    bottom += radius
+
+    t_entry = float('-inf')
+    t_exit = float('inf')
+    nx = ny = 0
+
+    if dx == 0:
+        if x <= left or x >= right:
+            return None
+    else:
+        t1 = (left - x) / dx
+        t2 = (right - x) / dx
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_entry:
+            t_entry = t1
+            nx, ny = (-1 if dx > 0 else 1), 0
+        t_exit = min(t_exit, t2)
+
+    if dy == 0:
+        if y <= top or y >= bottom:
+            return None
+    else:
+        t1 = (top - y) / dy
+        t2 = (bottom - y) / dy
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_entry:
+            t_entry = t1
+            nx, ny = 0, (-1 if dy > 0 else 1)
+        t_exit = min(t_exit, t2)
+
+    if t_entry >= t_exit or t_entry < 0 or t_entry > 1:
+        return None
+    return t_entry, nx, ny
+
+def sweep_circle_rects(x, y, dx, dy, radius, left, top, right, bottom):
+    """
+    Vectorized sweep_circle_rect over arrays of rectangles.
+    Returns (i, t, nx, ny) for the earliest hit, or None.
+    """
+    left = left - radius
+    top = top - radius
+    right = right + radius
+    bottom = bottom + radius
+    inf = np.inf
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if dx == 0:
+            tx1 = np.where((x > left) & (x < right), -inf, inf)
+            tx2 = np.full(len(left), inf)
+        else:
+            a = (left - x) / dx
+            b = (right - x) / dx
+            tx1 = np.minimum(a, b)
+            tx2 = np.maximum(a, b)
+        if dy == 0:
+            ty1 = np.where((y > top) & (y < bottom), -inf, inf)
+            ty2 = np.full(len(top), inf)
+        else:
+            a = (top - y) / dy
+            b = (bottom - y) / dy
+            ty1 = np.minimum(a, b)
+            ty2 = np.maximum(a, b)
+
+    t_entry = np.maximum(tx1, ty1)
+    t_exit = np.minimum(tx2, ty2)
+    valid = (t_entry < t_exit) & (t_entry >= 0) & (t_entry <= 1)
+    if not valid.any():
+        return None
+
+    i = int(np.argmin(np.where(valid, t_entry, inf)))
+    if tx1[i] >= ty1[i]:
+        return i, float(t_entry[i]), (-1 if dx > 0 else 1), 0
+    return i, float(t_entry[i]), 0, (-1 if dy > 0 else 1)
+
+def sweep_circles_rects(x, y, dx, dy, radius, left, top, right, bottom):
+    """
+    Element-wise sweep_circle_rect for arrays of circles paired with rectangles.
+    Returns arrays (t, nx, ny); t is inf where there is no hit.
+    """
+    left = left - radius
+    top = top - radius
+    right = right + radius
+    bottom = bottom + radius
+    inf = np.inf
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (left - x) / dx
+        b = (right - x) / dx
+        tx1 = np.where(dx == 0, np.where((x > left) & (x < right), -inf, inf), np.minimum(a, b))
+        tx2 = np.where(dx == 0, inf, np.maximum(a, b))
+        a = (top - y) / dy
+        b = (bottom - y) / dy
+        ty1 = np.where(dy == 0, np.where((y > top) & (y < bottom), -inf, inf), np.minimum(a, b))
+        ty2 = np.where(dy == 0, inf, np.maximum(a, b))
+
+    t_entry = np.maximum(tx1, ty1)
+    valid = (t_entry < np.minimum(tx2, ty2)) & (t_entry >= 0) & (t_entry <= 1)
+    x_face = tx1 >= ty1
+    t = np.where(valid, t_entry, inf)
+    nx = np.where(valid & x_face, np.where(dx > 0, -1, 1), 0)
+    ny = np.where(valid & ~x_face, np.where(dy > 0, -1, 1), 0)
+    return t, nx, ny
@@ -0,0 +1,146 @@
+"""
+Opt-in frame profiler with an in-game overlay and trace export
+"""
+
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+from config import Config
+
+NULL_PHASE = nullcontext()
+
+class Phase:
+    def __init__(self, name):
+        self.name = name
+        self.start = 0
+        self.total = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.total += end - self.start
+        Profiler.trace.append((self.name, self.start, end - self.start))
+        return False
+
+class Profiler:
+    enabled = False
+    capacity = Config.PROFILER_FRAMES
+    phases = {}
+    history = {}
+    frame_times = np.zeros(Config.PROFILER_FRAMES, dtype=np.float32)
+    frame = 0
+    frame_start = 0
+    trace = deque(maxlen=Config.PROFILER_TRACE_EVENTS)
+    origin = time.perf_counter_ns()
+    
+    @classmethod
+    def toggle(cls):
+        """Turn profiling on or off."""
+        cls.enabled = not cls.enabled
+        cls.frame_start = 0
+    
+    @classmethod
+    def phase(cls, name):
+        """Time a block of code as a named phase; a no-op context when disabled."""
+        if not cls.enabled:
+            return NULL_PHASE
+        phase = cls.phases.get(name)
+        if phase is None:
+            phase = cls.phases[name] = Phase(name)
+            cls.history[name] = np.zeros(cls.capacity, dtype=np.float32)
+        return phase
+    
+    @classmethod
+    def end_frame(cls):
+        """Close the current frame, moving phase totals into the ring buffers."""
+        if not cls.enabled:
+            return
+        now = time.perf_counter_ns()
+        slot = cls.frame % cls.capacity
+        if cls.frame_start:
+            cls.frame_times[slot] = (now - cls.frame_start) / 1e6
+            cls.trace.append(('frame', cls.frame_start, now - cls.frame_start))
+        for name, phase in cls.phases.items():
+            cls.history[name][slot] = phase.total / 1e6
+            phase.total = 0
+        cls.frame += 1
+        cls.frame_start = now
+    
+    @classmethod
+    def averages(cls):
+        """Get the mean milliseconds per frame of each phase over the ring buffer."""
+        frames = min(cls.frame, cls.capacity)
+        if frames == 0:
+            return {}
+        return {name: float(history[:frames].mean()) for name, history in cls.history.items()}
+    
+    @classmethod
+    def export_trace(cls, path):
+        """Write recorded phases in Trace Event Format (chrome://tracing, Perfetto)."""
+        events = [{'name': name, 'cat': 'frame' if name == 'frame' else 'phase', 'ph': 'X',
+                   'ts': (start - cls.origin) / 1000, 'dur': duration / 1000,
+                   'pid': 1, 'tid': 0 if name == 'frame' else 1}
+                  for name, start, duration in cls.trace]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    
+    @classmethod
+    def draw_overlay(cls, screen, font, counts):
+        """Draw the frame-time graph, phase timings and counts. Returns the area drawn."""
+        import pygame
+        
+        width, height = 260, 120
+        line_height = font.get_linesize()
+        rows = len(cls.history) + len(counts)
+        panel = pygame.Rect(10, 60, width, height + 10 + rows * line_height)
+        overlay = pygame.Surface(panel.size)
+        overlay.set_alpha(200)
+        overlay.fill((0, 0, 0))
+        screen.blit(overlay, panel)
+        
+        # Frame-time graph, oldest on the left; the line marks the frame budget
+        frames = min(cls.frame, cls.capacity)
+        budget = 1000.0 / Config.FPS
+        scale = height / (budget * 2)
+        graph_top = panel.y + 5
+        if frames:
+            times = np.roll(cls.frame_times, -(cls.frame % cls.capacity))[-frames:]
+            step = width / cls.capacity
+            points = [(panel.x + int(i * step), graph_top + height - min(height, int(t * scale)))
+                      for i, t in enumerate(times)]
+            if len(points) > 1:
+                pygame.draw.lines(screen, (88, 166, 255), False, points)
+        budget_y = graph_top + height - int(budget * scale)
+        pygame.draw.line(screen, (248, 81, 73), (panel.x, budget_y), (panel.right, budget_y))
+        
+        y = graph_top + height + 5
+        for name, ms in sorted(cls.averages().items()):
+            screen.blit(font.render(f"{name}: {ms:.2f} ms", True, (201, 209, 217)), (panel.x + 5, y))
+            y += line_height
+        for name, value in counts.items():
+            screen.blit(font.render(f"{name}: {value}", True, (139, 148, 158)), (panel.x + 5, y))
+            y += line_height
+        return panel
+
+class StartupTimer:
+    """Times the phases of startup so import and init regressions stand out."""
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+    
+    def mark(self, name):
+        """End the current phase, naming it."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+    
+    def report(self):
+        """Format the phases and total as one line."""
+        phases = ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases)
+        return f"Startup: {phases} (total {(self.last - self.start) * 1000:.0f} ms)"
@@ -0,0 +1,30 @@
+"""
+Cached text rendering for the HUD and overlays
+"""
+
+from collections import OrderedDict
+from utils.colors import Colors
+
+class TextCache:
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """Render text, reusing the surface if it was rendered before in this theme."""
+        key = (font, text, color, antialias, Colors.theme_version)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            # Evict the least recently used entry
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drop all cached surfaces."""
+        self.surfaces.clear()